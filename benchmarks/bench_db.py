@@ -0,0 +1,75 @@
+"""Compara sqlite3.connect por chamada com o pool compartilhado, com várias threads lendo e gravando.
+
+Uso: python benchmarks/bench_db.py [--threads 8] [--calls 50]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loterias.config import DB_FILE
+from loterias import db
+
+def legacy_get_draws(db_file, game_name):
+    conn = sqlite3.connect(db_file)
+    df = pd.read_sql(f"SELECT * FROM draws WHERE game = '{game_name}' ORDER BY concurso DESC", conn)
+    conn.close()
+    return df
+
+def legacy_save_user_game(db_file, i):
+    conn = sqlite3.connect(db_file)
+    conn.execute("INSERT INTO user_games (id, game_type, name, numbers, created_at, cost) VALUES (?,?,?,?,?,?)", (f"legacy{threading.get_ident()}_{i}", "Mega-Sena", "b", "[1,2,3,4,5,6]", "2024-01-01", 5.0))
+    conn.commit()
+    conn.close()
+
+def run_threads(n_threads, fn):
+    errors = []
+    def worker():
+        try: fn()
+        except Exception as e: errors.append(e)
+    ts = [threading.Thread(target=worker) for _ in range(n_threads)]
+    t0 = time.perf_counter()
+    for t in ts: t.start()
+    for t in ts: t.join()
+    return time.perf_counter() - t0, errors
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--db', default=DB_FILE)
+    ap.add_argument('--threads', type=int, default=8)
+    ap.add_argument('--calls', type=int, default=50)
+    args = ap.parse_args()
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'bench.db')
+        shutil.copy(args.db, path)
+
+        def legacy():
+            for i in range(args.calls):
+                legacy_get_draws(path, "Mega-Sena"); legacy_save_user_game(path, i)
+        t_old, err_old = run_threads(args.threads, legacy)
+
+        os.environ['LOTERIAS_DB'] = path
+        db.init_db()
+        def pooled():
+            for i in range(args.calls):
+                db.db_get_draws("Mega-Sena"); db.db_save_user_game("Mega-Sena", "b", [1, 2, 3, 4, 5, 6], 5.0)
+        t_new, err_new = run_threads(args.threads, pooled)
+        db.get_pool().close()
+
+        ops = args.threads * args.calls * 2
+        print(f"connect por chamada: {t_old:.3f}s ({ops / t_old:,.0f} ops/s, {len(err_old)} erros)")
+        print(f"pool compartilhado:  {t_new:.3f}s ({ops / t_new:,.0f} ops/s, {len(err_new)} erros)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Compara o motor de bitmask com o caminho antigo via iterrows.
+
+Uso: python benchmarks/bench_hits.py [--tickets 300] [--db loterias.db]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loterias import db
+from loterias.config import BASE_CONFIG, DB_FILE
+from loterias.scoring import calculate_roi, run_backtest, calculate_hits
+
+# --- Implementação original (referência) ---
+
+def legacy_calculate_roi(df_history, user_games, game_name):
+    cfg = BASE_CONFIG[game_name]
+    total_spent = sum(g['cost'] for g in user_games)
+    total_won = 0
+    wins_count = {k:0 for k in cfg['labels'].keys()}
+    if df_history.empty: return 0, 0, wins_count
+    cols_draw = [f'D{i}' for i in range(1, cfg['draw'] + 1)]
+    for game in user_games:
+        game_dt = pd.to_datetime(game['date'])
+        valid = df_history[df_history['Data'] >= game_dt]
+        game_set = set(game['nums'])
+        for _, draw in valid.iterrows():
+            hits = len(game_set.intersection({draw[c] for c in cols_draw}))
+            if hits in cfg['est_prize']:
+                total_won += cfg['est_prize'][hits]; wins_count[hits] += 1
+    return total_spent, total_won, wins_count
+
+def legacy_run_backtest(df, numbers, game_name):
+    cfg = BASE_CONFIG[game_name]
+    cols_draw = [f'D{i}' for i in range(1, cfg['draw'] + 1)]
+    game_set, hist, won = set(numbers), [], 0
+    for _, row in df.iterrows():
+        hits = len(game_set.intersection({row[c] for c in cols_draw}))
+        if hits >= cfg['min_win']:
+            prize = cfg['est_prize'].get(hits, 0); won += prize
+            hist.append({"Concurso": row['Concurso'], "Data": row['Data'], "Acertos": hits, "Prêmio": prize})
+    return hist, won
+
+def legacy_calculate_hits(df, game_nums, start_date, game_name):
+    cfg = BASE_CONFIG[game_name]
+    if df.empty: return []
+    try: start_dt = pd.to_datetime(start_date)
+    except: start_dt = df['Data'].min()
+    valid = df[df['Data'] >= start_dt].copy()
+    hits = []
+    game_set = set(game_nums)
+    cols_draw = [f'D{i}' for i in range(1, cfg['draw'] + 1)]
+    for _, row in valid.iterrows():
+        matches = game_set.intersection({row[c] for c in cols_draw})
+        if len(matches) > 0:
+            hits.append({"Concurso": row['Concurso'], "Data": row['Data'].strftime('%d/%m/%Y'), "Acertos": len(matches), "Dezenas Sorteadas": sorted(list({row[c] for c in cols_draw})), "Seus Acertos": sorted(list(matches))})
+    hits.sort(key=lambda x: x['Acertos'], reverse=True)
+    return hits
+
+# --- Dados ---
+
+def random_wallet(game_name, n, dates, rng):
+    cfg = BASE_CONFIG[game_name]
+    wallet = []
+    for i in range(n):
+        size = int(rng.integers(cfg['draw'], cfg['draw'] + 3))
+        nums = sorted(int(x) for x in rng.choice(np.arange(1, cfg['range'] + 1), size, replace=False))
+        wallet.append({"id": str(i), "nums": nums, "date": str(dates[int(rng.integers(len(dates)))])[:10], "cost": cfg['cost']})
+    return wallet
+
+def timed(fn, *args):
+    t0 = time.perf_counter(); out = fn(*args)
+    return out, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--db', default=DB_FILE)
+    ap.add_argument('--tickets', type=int, default=300)
+    ap.add_argument('--seed', type=int, default=42)
+    args = ap.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    # Cópia temporária: init_db migra o esquema e o banco informado fica intacto.
+    tmp = tempfile.mkdtemp()
+    shutil.copy(args.db, os.path.join(tmp, 'bench.db'))
+    os.environ['LOTERIAS_DB'] = os.path.join(tmp, 'bench.db')
+    db.init_db()
+
+    print(f"{'jogo':<10} {'função':<15} {'iterrows':>10} {'bitmask':>10} {'ganho':>8}")
+    for game in BASE_CONFIG:
+        df = db.db_get_draws(game)
+        if df.empty: continue
+        wallet = random_wallet(game, args.tickets, df['Data'].sort_values().to_numpy(), rng)
+        cases = [
+            ("calculate_roi", legacy_calculate_roi, calculate_roi, (df, wallet, game)),
+            ("run_backtest", legacy_run_backtest, run_backtest, (df, wallet[0]['nums'], game)),
+            ("calculate_hits", legacy_calculate_hits, calculate_hits, (df, wallet[0]['nums'], df['Data'].min(), game)),
+        ]
+        for name, old, new, fargs in cases:
+            r_old, t_old = timed(old, *fargs)
+            r_new, t_new = timed(new, *fargs)
+            assert r_old == r_new, f"{game}/{name}: resultados divergentes"
+            print(f"{game:<10} {name:<15} {t_old:>9.3f}s {t_new:>9.4f}s {t_old / max(t_new, 1e-9):>7.0f}x")
+    db.get_pool().close()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
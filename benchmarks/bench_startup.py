@@ -0,0 +1,76 @@
+"""Partida a frio e custo por rerun do streamlit_app.py (via streamlit.testing), num processo novo por medição.
+
+Mede também só o bloco de imports do topo do script (até st.set_page_config), com streamlit já carregado:
+o AppTest importa plotly por conta própria, então ali não dá para ver o que o script carrega.
+
+Uso: python benchmarks/bench_startup.py [--runs 5] [--reruns 20] [--page "🏠 Home"]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_st = time.perf_counter() - t0
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t1 = time.perf_counter(); at.run(); cold = time.perf_counter() - t1
+page = sys.argv[3]
+if page != at.sidebar.radio[-1].value: at.sidebar.radio[-1].set_value(page).run()
+times = []
+for _ in range(int(sys.argv[2])):
+    t1 = time.perf_counter(); at.run(); times.append(time.perf_counter() - t1)
+mods = sorted(m for m in sys.modules if m.split('.')[0] in ('plotly', 'requests', 'openpyxl', 'urllib3', 'lxml'))
+print(json.dumps({"streamlit_s": t_st, "cold_s": cold, "rerun_s": times, "heavy": sorted({m.split('.')[0] for m in mods}),
+                  "exc": [str(e.value) for e in at.exception]}))
+"""
+
+IMPORTS = r"""
+import json, sys, time
+import streamlit
+src = open(sys.argv[1], encoding='utf-8').read()
+header = src[:src.index('st.set_page_config(')]
+before = set(sys.modules)
+t0 = time.perf_counter(); exec(compile(header, sys.argv[1], 'exec'), {'__name__': 'bench'}); dt = time.perf_counter() - t0
+new = {m.split('.')[0] for m in set(sys.modules) - before}
+print(json.dumps({"imports_s": dt, "heavy": sorted(new & {'plotly', 'requests', 'urllib3', 'openpyxl', 'lxml'})}))
+"""
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--runs', type=int, default=5)
+    ap.add_argument('--reruns', type=int, default=20)
+    ap.add_argument('--page', default="🏠 Home")
+    args = ap.parse_args()
+    tmp = tempfile.mkdtemp()
+    try:
+        shutil.copy(os.path.join(ROOT, 'loterias.db'), os.path.join(tmp, 'bench.db'))
+        # Endpoint inexistente: mede o script, não a rede.
+        env = dict(os.environ, LOTERIAS_DB=os.path.join(tmp, 'bench.db'), LOTERIAS_API="http://127.0.0.1:9/api")
+        imp = [json.loads(subprocess.run([sys.executable, '-c', IMPORTS, os.path.join(ROOT, 'streamlit_app.py')],
+                                         capture_output=True, text=True, env=env, cwd=ROOT).stdout) for _ in range(args.runs)]
+        print(f"imports do script: {statistics.median(i['imports_s'] for i in imp) * 1000:.0f}ms (mediana de {args.runs}); "
+              f"pesados: {', '.join(imp[0]['heavy']) or 'nenhum'}")
+        cold, rerun, heavy = [], [], set()
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, '-c', CHILD, os.path.join(ROOT, 'streamlit_app.py'), str(args.reruns), args.page],
+                                 capture_output=True, text=True, env=env, cwd=ROOT)
+            res = json.loads(out.stdout.strip().splitlines()[-1])
+            if res['exc']: print("Exceção:", res['exc'])
+            cold.append(res['cold_s']); rerun += res['rerun_s']; heavy |= set(res['heavy'])
+        print(f"primeira execução: {statistics.median(cold) * 1000:.0f}ms (mediana de {args.runs})")
+        print(f"rerun ({args.page}): {statistics.median(rerun) * 1000:.1f}ms mediana, {sorted(rerun)[int(len(rerun) * 0.95) - 1] * 1000:.1f}ms p95")
+        print(f"módulos pesados após os reruns (inclui os do próprio AppTest): {', '.join(sorted(heavy)) or 'nenhum'}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Suíte de benchmarks das funções de ETL, banco e análise, com dados reais e sintéticos escalados.
+
+Usa o db_megasena.csv do repositório (escala 1) e réplicas sintéticas dele (escala N = N vezes os sorteios),
+sempre num banco temporário. Cada caso roda --repeat vezes; vale a mediana.
+
+Uso:
+  python benchmarks/suite.py                                  # escalas 1 e 10
+  python benchmarks/suite.py --scales 1 10 100 --tickets 10000
+  python benchmarks/suite.py --save benchmarks/baseline.json  # grava a linha de base
+  python benchmarks/suite.py --compare benchmarks/baseline.json --tolerance 0.25  # sai com 1 se regredir
+
+Tempos absolutos só valem na máquina e nas versões em que a base foi gravada (o "meta" do JSON;
+benchmarks/requirements.txt fixa as da base do repositório). Em outro ambiente, --compare só avisa:
+grave uma base local com --save antes de mudar o código e compare com ela.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from loterias import db
+from loterias.cache import draw_cache
+from loterias.config import BASE_CONFIG
+from loterias.etl import process_dataframe
+from loterias.generator import generate_smart_games, sample_subsets
+from loterias.metrics import registry
+from loterias.patterns import gap_stats, top_pairs
+from loterias.scoring import calculate_hits, calculate_roi, run_backtest
+from loterias.stats import StatsIndex
+
+GAME = "Mega-Sena"
+CSV = os.path.join(ROOT, "db_megasena.csv")
+
+# --- Dados ---
+
+def raw_frame(scale, rng):
+    """Arquivo da Caixa como chega (texto), com `scale` vezes os sorteios reais."""
+    raw = pd.read_csv(CSV, dtype=str)
+    if scale == 1: return raw
+    cfg = BASE_CONFIG[GAME]
+    n = len(raw) * scale
+    nums = sample_subsets(rng, np.arange(1, cfg['range'] + 1), cfg['draw'], n)
+    out = pd.DataFrame({'Concurso': np.arange(1, n + 1).astype(str),
+                        'Data': pd.date_range('1900-01-01', periods=n, freq='D').strftime('%d/%m/%Y')})
+    for i in range(cfg['draw']): out[f'D{i + 1}'] = nums[:, i].astype(str)
+    return out
+
+def tickets(n, rng):
+    cfg = BASE_CONFIG[GAME]
+    nums = sample_subsets(rng, np.arange(1, cfg['range'] + 1), cfg['draw'], n)
+    return [{"id": str(i), "type": GAME, "nome": f"b{i}", "nums": sorted(int(x) for x in row), "date": "1990-01-01", "cost": cfg['cost']}
+            for i, row in enumerate(nums)]
+
+# --- Casos ---
+
+def cases(scale, n_tickets, rng):
+    raw = raw_frame(scale, rng)
+    clean = process_dataframe(raw.copy(), GAME)
+    db.db_save_draws(clean, GAME); draw_cache.invalidate()
+    df = db.db_get_draws(GAME)
+    wallet = tickets(n_tickets, rng)
+    one = wallet[0]['nums']
+    recent = df['Data'].iloc[len(df) // 10]  # 10% mais recentes: filtro de data resolvido no SQL
+    ds = draw_cache.get(GAME)
+    rg = BASE_CONFIG[GAME]['range']
+    def frequency():
+        idx = StatsIndex.build(ds, rg)
+        lo, hi = idx.window(int(ds.concurso[0]), int(ds.concurso[-1]))
+        idx.frequency(lo, hi); gap_stats(idx, lo, hi); top_pairs(idx, lo, hi)
+    return [
+        ("process_dataframe", lambda: process_dataframe(raw.copy(), GAME)),
+        ("db_save_draws", lambda: db.db_save_draws(clean, GAME)),
+        ("db_get_draws", lambda: db.db_get_draws(GAME)),
+        ("db_get_draws[since]", lambda: db.db_get_draws(GAME, since=recent)),
+        (f"calculate_roi[{n_tickets}]", lambda: calculate_roi(df, wallet, GAME)),
+        ("run_backtest", lambda: run_backtest(df, one, GAME)),
+        ("calculate_hits", lambda: calculate_hits(df, one, "1900-01-01", GAME)),
+        ("calculate_hits[since]", lambda: calculate_hits(db.db_get_draws(GAME, since=recent), one, recent, GAME)),
+        ("generate_smart_games[1000]", lambda: generate_smart_games(GAME, 1000, 8, seed=0)),
+        ("frequency_analysis", frequency),
+    ]
+
+def measure(fn, repeat):
+    fn()  # aquecimento
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); times.append(time.perf_counter() - t0)
+    return statistics.median(times), min(times)
+
+# --- Linha de base ---
+
+ENV_KEYS = ("python", "numpy", "pandas", "sqlite", "machine", "cpus")
+
+def environment(args):
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "sqlite": sqlite3.sqlite_version, "machine": platform.machine(), "cpus": os.cpu_count(),
+            "tickets": args.tickets, "repeat": args.repeat}
+
+def env_mismatch(meta, baseline):
+    """Chaves do ambiente que diferem da linha de base (tempos absolutos só se comparam no mesmo ambiente)."""
+    base = baseline.get('meta', {})
+    return [(k, base.get(k), meta.get(k)) for k in ENV_KEYS + ("tickets",) if base.get(k) != meta.get(k)]
+
+def compare(results, baseline, tolerance):
+    """Lista de (caso, atual, base, razão) acima de 1 + tolerance."""
+    base = baseline.get('results', {})
+    return [(k, v, base[k], v / base[k]) for k, v in results.items() if base.get(k) and v / base[k] > 1 + tolerance]
+
+def missing(results, baseline):
+    """Casos medidos agora que não existem na linha de base (não são comparados)."""
+    return sorted(k for k in results if k not in baseline.get('results', {}))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    ap.add_argument('--tickets', type=int, default=10_000)
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--save')
+    ap.add_argument('--compare')
+    ap.add_argument('--tolerance', type=float, default=0.25)
+    ap.add_argument('--strict', action='store_true', help="falha em regressão mesmo com ambiente diferente da base")
+    args = ap.parse_args()
+    registry.enabled = False  # mede as funções, não a instrumentação
+    results = {}
+    print(f"{'caso':<30} {'escala':>6} {'mediana':>10} {'mínimo':>10}")
+    for scale in args.scales:
+        tmp = tempfile.mkdtemp()
+        try:
+            os.environ['LOTERIAS_DB'] = os.path.join(tmp, 'bench.db')
+            db.init_db(); draw_cache.invalidate()
+            for name, fn in cases(scale, args.tickets, np.random.default_rng(args.seed)):
+                med, best = measure(fn, args.repeat)
+                results[f"{name}@{scale}x"] = med
+                print(f"{name:<30} {scale:>5}x {med * 1000:>8.1f}ms {best * 1000:>8.1f}ms")
+            db.get_pool().close()
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    meta = environment(args)
+    if args.save:
+        with open(args.save, 'w') as f: json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"Linha de base gravada em {args.save}")
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+        for k in missing(results, baseline): print(f"SEM BASE {k}: regrave a linha de base para comparar")
+        diff = env_mismatch(meta, baseline)
+        for k, b, v in diff: print(f"AMBIENTE {k}: {v} (base: {b})")
+        slow = compare(results, baseline, args.tolerance)
+        for k, v, b, r in slow: print(f"REGRESSÃO {k}: {v * 1000:.1f}ms vs {b * 1000:.1f}ms ({r:.2f}x)")
+        if diff and not args.strict:
+            print("Ambiente diferente da linha de base: razões só indicativas (grave uma base nesta máquina com --save).")
+        elif slow: sys.exit(1)
+        else: print(f"Sem regressões acima de {args.tolerance:.0%}.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Conferência do download incremental (download_delta) e do resultado ao vivo (LiveResults) contra um
+servidor HTTP local que imita a API da Caixa, num banco temporário. Não acessa a rede.
+
+Cobre: delta com concursos novos, "sem novidades", fallback para o dump completo acima de MAX_DELTA,
+base vazia, TTL do resultado ao vivo e o disjuntor (abre após falhas, meio-aberto após o cooldown).
+
+Uso: python checks/check_endpoints.py   # sai com 1 se alguma conferência falhar
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from loterias import db
+from loterias.cache import draw_cache
+from loterias.config import BASE_CONFIG
+from loterias.etl import MAX_DELTA, download_delta, download_update_data
+from loterias.live import CircuitBreaker, LiveResults
+
+GAME = "Mega-Sena"
+SLUG = BASE_CONFIG[GAME]['slug']
+
+# --- Servidor falso ---
+
+def draw_numbers(concurso):
+    return sorted((concurso * 7 + i * 11) % 60 + 1 for i in range(6))  # 6 dezenas distintas por concurso
+
+def draw_json(concurso):
+    return {"numero": concurso, "dataApuracao": "01/01/2020", "acumulado": False,
+            "listaDezenas": [f"{d:02d}" for d in draw_numbers(concurso)]}
+
+def dump_html(last):
+    rows = "".join(f"<tr><td>{c}</td><td>01/01/2020</td>" + "".join(f"<td>{d}</td>" for d in draw_numbers(c)) + "</tr>"
+                   for c in range(1, last + 1))
+    head = "<tr><th>Concurso</th><th>Data Sorteio</th>" + "".join(f"<th>Bola{i}</th>" for i in range(1, 7)) + "</tr>"
+    return f"<table>{head}{rows}</table>"
+
+class Stub:
+    """Estado do servidor: último concurso publicado, modo de falha e caminhos pedidos."""
+    def __init__(self):
+        self.latest, self.failing, self.paths = 0, False, []
+        self._lock = threading.Lock()
+
+    def reset(self, latest=None, failing=False):
+        with self._lock:
+            if latest is not None: self.latest = latest
+            self.failing, self.paths = failing, []
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+
+        def _send(self, code, body, ctype="application/json"):
+            data = body.encode('utf-8')
+            self.send_response(code)
+            self.send_header("Content-Type", ctype); self.send_header("Content-Length", str(len(data)))
+            self.end_headers(); self.wfile.write(data)
+
+        def do_GET(self):
+            with stub._lock: stub.paths.append(self.path)
+            if stub.failing: return self._send(503, "{}")
+            parts = [p for p in self.path.split('/') if p]
+            if parts == ['dump']: return self._send(200, dump_html(stub.latest), "text/html; charset=utf-8")
+            if not parts or parts[0] != SLUG: return self._send(404, "{}")
+            concurso = int(parts[1]) if len(parts) > 1 else stub.latest
+            if not 1 <= concurso <= stub.latest: return self._send(404, "{}")
+            self._send(200, json.dumps(draw_json(concurso)))
+    return Handler
+
+# --- Conferências ---
+
+failures = []
+
+def check(cond, msg):
+    print(f"{'ok  ' if cond else 'FALHA'} {msg}")
+    if not cond: failures.append(msg)
+
+def seed_draws(last):
+    df = pd.DataFrame([{"Concurso": c, "Data": pd.Timestamp("2020-01-01"), **{f"D{i}": d for i, d in enumerate(draw_numbers(c), 1)}}
+                       for c in range(1, last + 1)])
+    db.db_save_draws(df, GAME); draw_cache.invalidate()
+
+def check_delta(stub, base):
+    check(download_delta(GAME, base_url=base) is None, "base vazia: download_delta devolve None (histórico completo)")
+    seed_draws(10)
+    stub.reset(latest=13)
+    res = download_delta(GAME, base_url=base)
+    check(res == (True, "Atualizado: 3"), f"delta de 3 concursos: {res}")
+    check(sorted(stub.paths) == sorted([f"/{SLUG}/", f"/{SLUG}/11", f"/{SLUG}/12"]), f"só o último e os que faltam: {stub.paths}")
+    check(db.db_get_last_concurso(GAME) == 13, "concursos 11-13 gravados")
+    got = db.db_get_draws(GAME, start=11, end=13)
+    check(got.sort_values('Concurso')[[f"D{i}" for i in range(1, 7)]].values.tolist() == [draw_numbers(c) for c in (11, 12, 13)],
+          "dezenas do delta iguais às da API")
+    stub.reset()
+    res = download_delta(GAME, base_url=base)
+    check(res == (True, "Sem novidades (Conc 13)") and stub.paths == [f"/{SLUG}/"], f"sem novidades com 1 requisição: {res}")
+    stub.reset(latest=13 + MAX_DELTA + 1)
+    check(download_delta(GAME, base_url=base) is None and len(stub.paths) == 1, f"atraso > MAX_DELTA ({MAX_DELTA}): None sem buscar concursos")
+    stub.reset()
+    ok, msg = download_update_data(GAME, base_url=base, full_url=f"{base}/dump")
+    check(ok and "/dump" in stub.paths and db.db_get_last_concurso(GAME) == stub.latest, f"fallback para o dump completo: {msg}")
+    stub.reset(failing=True)
+    ok, msg = download_update_data(GAME, base_url=base, full_url=f"{base}/dump")
+    check(not ok and f"/{SLUG}/" in stub.paths and "/dump" in stub.paths, f"API fora do ar: tenta o dump e devolve o erro ({msg})")
+
+class Clock:
+    def __init__(self, t=1_000_000.0): self.t = t
+    def __call__(self): return self.t
+
+def check_live(stub, base):
+    clock, mono = Clock(), Clock()
+    live = LiveResults(base_url=base, ttl=60, timeout=2, clock=clock,
+                       breaker=CircuitBreaker(threshold=2, cooldown=30, clock=mono))
+    stub.reset(latest=100)
+    js, fetched_at = live.get(GAME, wait=True)
+    check(js['numero'] == 100 and fetched_at == clock.t and len(stub.paths) == 1, "primeira consulta busca na API")
+    stub.reset(latest=101); clock.t += 30
+    check(live.get(GAME)[0]['numero'] == 100 and not stub.paths and not live.fetching(GAME), "dentro do TTL: memória, sem requisição")
+    fresh = LiveResults(base_url=base, ttl=60, clock=clock)
+    check(fresh.get(GAME)[0]['numero'] == 100 and not stub.paths, "nova instância dentro do TTL: lê do SQLite")
+    clock.t += 31
+    check(live.get(GAME, wait=True)[0]['numero'] == 101 and len(stub.paths) == 1, "TTL vencido: atualiza")
+
+    stub.reset(failing=True); clock.t += 61
+    for _ in range(2): live.get(GAME, wait=True)
+    check(live.breaker.state == 'aberto' and len(stub.paths) == 2, f"disjuntor abre após 2 falhas ({live.breaker.state})")
+    stub.reset(failing=True)
+    entry = live.get(GAME, wait=True)
+    check(entry[0]['numero'] == 101 and not stub.paths and live.refresh(GAME) is None, "aberto: sem requisição, devolve o último salvo")
+    mono.t += 31
+    check(live.breaker.state == 'meio-aberto', "meio-aberto após o cooldown")
+    live.get(GAME, wait=True)
+    check(live.breaker.state == 'aberto' and len(stub.paths) == 1, "meio-aberto: uma tentativa; falhou, reabre")
+    probe = CircuitBreaker(threshold=1, cooldown=30, clock=mono)
+    probe.failure(); mono.t += 31
+    check([probe.allow() for _ in range(3)] == [True, False, False], "meio-aberto: só a primeira chamada concorrente passa")
+    stub.reset(latest=102); mono.t += 31
+    check(live.get(GAME, wait=True)[0]['numero'] == 102 and live.breaker.state == 'fechado', "serviço de volta: fecha o disjuntor")
+
+def main():
+    stub = Stub()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(stub))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{srv.server_port}"
+    tmp = tempfile.mkdtemp()
+    try:
+        os.environ['LOTERIAS_DB'] = os.path.join(tmp, 'check.db')
+        db.init_db(); draw_cache.invalidate()
+        check_delta(stub, base)
+        check_live(stub, base)
+        db.get_pool().close()
+    finally:
+        srv.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(f"{len(failures)} falha(s)." if failures else "Tudo certo.")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1 @@
+# Lógica do Loterias Pro Ultimate, importável sem subir a interface Streamlit.
@@ -0,0 +1,316 @@
+"""Conferência em lote de arquivos de volantes, sem a interface.
+
+Uso: python -m loterias.batch volantes.csv --game megasena [--start 2900] [--end 2961] [--out resultado.csv]
+     python -m loterias.batch --serve 8765   # POST /score?game=megasena&start=2900 com o CSV/JSON no corpo
+
+O serviço lê o corpo e devolve o CSV em streaming (chunked); o resumo vem nos trailers X-Tickets, X-Prize...
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from loterias.bitmask import encode_matrix, encode_tickets
+from loterias.config import BASE_CONFIG
+from loterias.db import db_get_draw_arrays, db_get_prizes, init_db
+from loterias.parallel import default_workers, mp_context
+from loterias.scoring import payout_matrix, score_chunk
+
+# --- Conferência em lote ---
+# Os volantes são lidos em streaming e agrupados em blocos; cada bloco vira bitmasks e é conferido
+# contra todos os sorteios da faixa de concursos em um processo do pool (scoring.score_chunk: fora deste
+# módulo, que é o __main__ da CLI). Os resultados saem na ordem
+# de entrada, à medida que os blocos terminam (no máximo 2 blocos por worker em memória).
+
+CELLS = 16_000_000  # volantes x sorteios por bloco (a matriz de acertos do bloco tem 1 byte por célula)
+MAX_REJECTED_IDS = 10
+
+class BatchReport(NamedTuple):
+    tickets: int
+    draws: int
+    seconds: float
+    tiers: dict    # faixa -> ocorrências
+    prize: float
+    rejected: int = 0   # volantes com menos dezenas distintas que o sorteio (não conferidos)
+    rejected_ids: tuple = ()  # os primeiros deles, para a mensagem
+
+    @property
+    def rate(self):
+        """Volantes x sorteios conferidos por segundo."""
+        return self.tickets * self.draws / self.seconds if self.seconds else 0.0
+
+# --- Leitura dos volantes ---
+
+def _numbers(cells, num_range):
+    out = []
+    for c in cells:
+        c = str(c).strip()
+        if c.isdigit() and 1 <= int(c) <= num_range: out.append(int(c))
+    return out
+
+ID_COLUMNS = ('id', 'nome', 'name')
+
+def iter_csv_tickets(lines, num_range):
+    """CSV com ou sem cabeçalho. Coluna id/nome (se houver) identifica o volante; as demais são dezenas.
+    A primeira linha só é cabeçalho se nomear a coluna de id ou não tiver nenhuma dezena válida."""
+    rows = csv.reader(lines)
+    first = next(rows, None)
+    if first is None: return
+    cells = [c.strip() for c in first]
+    names = [c.lower() for c in cells]
+    if any(n in names for n in ID_COLUMNS) or not _numbers(cells, num_range):
+        id_col = next((names.index(n) for n in ID_COLUMNS if n in names), None)
+        first = None
+    else:  # sem cabeçalho: a primeira célula não numérica (ex.: "joao,1,2,3,4,5,6") é o id
+        id_col = next((i for i, c in enumerate(cells) if c and not c.isdigit()), None)
+    n = 0
+    for row in itertools.chain([first] if first else [], rows):
+        if not row: continue
+        n += 1
+        tid = row[id_col].strip() if id_col is not None and id_col < len(row) else str(n)
+        yield tid, _numbers([c for i, c in enumerate(row) if i != id_col], num_range)
+
+def iter_json_tickets(obj, num_range):
+    """Lista de volantes: listas de dezenas ou objetos do backup ({'id', 'nome', 'nums'})."""
+    for n, t in enumerate(obj, 1):
+        if isinstance(t, dict): yield str(t.get('id') or t.get('nome') or n), _numbers(t.get('nums', []), num_range)
+        else: yield str(n), _numbers(t, num_range)
+
+def iter_tickets(fileobj, filename, num_range):
+    """(id, dezenas) por volante, pelo formato do nome do arquivo. Aceita arquivo binário ou texto."""
+    text = fileobj if isinstance(fileobj, io.TextIOBase) else io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    name = filename.lower()
+    if name.endswith('.jsonl'):
+        yield from iter_json_tickets((json.loads(l) for l in text if l.strip()), num_range)
+    elif name.endswith('.json'): yield from iter_json_tickets(json.load(text), num_range)
+    else: yield from iter_csv_tickets(text, num_range)
+
+def chunks(tickets, size):
+    buf = []
+    for t in tickets:
+        buf.append(t)
+        if len(buf) >= size: yield buf; buf = []
+    if buf: yield buf
+
+# --- Conferência ---
+
+def load_draws(game_name, start=None, end=None):
+    """(concursos, bitmasks, pagamentos) dos sorteios na faixa [start, end], com o rateio real quando gravado."""
+    conc, _, nums = db_get_draw_arrays(game_name, start=start, end=end)
+    payouts = payout_matrix(pd.DataFrame({'Concurso': conc}), game_name, db_get_prizes(game_name))
+    return conc, encode_matrix(nums, BASE_CONFIG[game_name]['range']), payouts
+
+def _ordered(ex, fn, jobs, window):
+    """executor.map com no máximo `window` tarefas pendentes (não consome o gerador inteiro de uma vez)."""
+    pending = deque()
+    for args in jobs:
+        pending.append((args, ex.submit(fn, *args[1:])))
+        if len(pending) >= window:
+            a, f = pending.popleft(); yield a, f.result()
+    while pending:
+        a, f = pending.popleft(); yield a, f.result()
+
+def score_tickets(tickets, game_name, start=None, end=None, workers=None, chunk=None):
+    """Gerador: rende (ids, dezenas, melhor, ocorrências por faixa, prêmio) por bloco, na ordem de entrada.
+    O relatório final (BatchReport) é o valor de retorno do gerador (StopIteration.value)."""
+    cfg = BASE_CONFIG[game_name]
+    t0 = time.perf_counter()
+    conc, dmasks, payouts = load_draws(game_name, start, end)
+    workers = workers or default_workers()
+    chunk = chunk or max(1, CELLS // max(1, len(conc)))
+    tiers = sorted(cfg['est_prize'])
+    tier_tot = np.zeros(len(tiers), dtype=np.int64); prize_tot, n = 0.0, 0
+    rejected = [0, []]  # total, primeiros ids
+    def valid(ts):
+        for t in ts:
+            if len(set(t[1])) >= cfg['draw']: yield t
+            else:
+                rejected[0] += 1
+                if len(rejected[1]) < MAX_REJECTED_IDS: rejected[1].append(t[0])
+    jobs = ((c, game_name, encode_tickets([t[1] for t in c], cfg['range']), dmasks, payouts) for c in chunks(valid(tickets), chunk))
+    if workers == 1: results = ((job, score_chunk(*job[1:])) for job in jobs)
+    else:
+        ex = ProcessPoolExecutor(workers, mp_context=mp_context())
+        results = _ordered(ex, score_chunk, jobs, 2 * workers)
+    try:
+        for job, (best, per_tier, prize) in results:
+            c = job[0]
+            tier_tot += per_tier.sum(axis=0); prize_tot += float(prize.sum()); n += len(c)
+            yield [t[0] for t in c], [t[1] for t in c], best, per_tier, prize
+    finally:
+        if workers != 1: ex.shutdown(cancel_futures=True)
+    return BatchReport(n, len(conc), time.perf_counter() - t0,
+                       {cfg['labels'].get(k, f"{k} pts"): int(v) for k, v in zip(tiers, tier_tot)}, prize_tot,
+                       rejected[0], tuple(rejected[1]))
+
+def write_results(out, game_name, tickets, **kw):
+    """Escreve o CSV por volante (id, dezenas, melhor, faixas, prêmio) e retorna o BatchReport."""
+    cfg = BASE_CONFIG[game_name]
+    w = csv.writer(out)
+    w.writerow(["id", "dezenas", "melhor"] + [cfg['labels'].get(k, f"{k} pts") for k in sorted(cfg['est_prize'])] + ["premio"])
+    gen = score_tickets(tickets, game_name, **kw)
+    while True:
+        try: ids, nums, best, per_tier, prize = next(gen)
+        except StopIteration as stop: return stop.value
+        w.writerows([tid, " ".join(f"{x:02d}" for x in sorted(ns)), int(b), *pt.tolist(), round(float(p), 2)]
+                    for tid, ns, b, pt, p in zip(ids, nums, best, per_tier, prize))
+        out.flush()  # um bloco por vez: no HTTP vira um chunk da resposta
+
+def format_report(rep):
+    tiers = ", ".join(f"{k}: {v:,}" for k, v in rep.tiers.items())
+    return (f"{rep.tickets:,} volantes x {rep.draws:,} sorteios em {rep.seconds:.2f}s "
+            f"({rep.rate:,.0f} volantes x sorteios/s)\nfaixas: {tiers}\nprêmio total: R$ {rep.prize:,.2f}"
+            + (f"\nignorados (dezenas insuficientes): {rep.rejected:,} ({', '.join(rep.rejected_ids)}"
+               f"{', ...' if rep.rejected > len(rep.rejected_ids) else ''})" if rep.rejected else ""))
+
+# --- HTTP ---
+
+REPORT_HEADERS = ("X-Tickets", "X-Draws", "X-Seconds", "X-Rate", "X-Prize", "X-Rejected")
+
+def report_headers(rep):
+    return dict(zip(REPORT_HEADERS, (str(rep.tickets), str(rep.draws), f"{rep.seconds:.4f}", f"{rep.rate:.0f}",
+                                     f"{rep.prize:.2f}", str(rep.rejected))))
+
+class RequestBody(io.RawIOBase):
+    """Corpo da requisição lido sob demanda: até o Content-Length ou em Transfer-Encoding: chunked."""
+    def __init__(self, rfile, length=None, chunked=False):
+        self.rfile, self.left, self.chunked, self.done = rfile, length or 0, chunked, False
+
+    def readable(self): return True
+
+    def readinto(self, b):
+        if self.chunked and self.left == 0 and not self.done:
+            size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                while self.rfile.readline().strip(): pass  # trailers da requisição
+                self.done = True
+            self.left = size
+        if self.left <= 0: return 0
+        n = self.rfile.readinto(memoryview(b)[:min(len(b), self.left)])
+        if not n: raise ValueError("corpo da requisição terminou antes do esperado")
+        self.left -= n
+        if self.chunked and self.left == 0: self.rfile.readline()  # CRLF do fim do chunk
+        return n
+
+class ChunkedResponse:
+    """Arquivo de texto para write_results: cada flush() vira um chunk HTTP. O status 200 só sai no
+    primeiro chunk, então erros antes disso (sorteios, primeiro bloco) ainda viram 4xx/5xx."""
+    def __init__(self, handler):
+        self.handler, self.buf, self.started = handler, io.StringIO(), False
+
+    def write(self, s): return self.buf.write(s)
+
+    def flush(self):
+        data = self.buf.getvalue().encode('utf-8')
+        self.buf = io.StringIO()
+        h = self.handler
+        if not self.started:
+            h.send_response(200)
+            h.send_header("Content-Type", "text/csv; charset=utf-8"); h.send_header("Transfer-Encoding", "chunked")
+            h.send_header("Trailer", ", ".join(REPORT_HEADERS)); h.end_headers()
+            self.started = True
+        if data: h.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def finish(self, rep):
+        self.flush()
+        trailers = "".join(f"{k}: {v}\r\n" for k, v in report_headers(rep).items())
+        self.handler.wfile.write(b"0\r\n" + trailers.encode('ascii') + b"\r\n")
+
+class ScoreHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # resposta em chunks
+    workers = None
+
+    def log_message(self, *args): pass
+
+    def _send(self, code, body, ctype="text/plain; charset=utf-8", headers=None):
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", ctype); self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.end_headers(); self.wfile.write(data)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health": self._send(200, "ok")
+        else: self._send(404, "use POST /score")
+
+    def do_POST(self):
+        # O corpo nunca é lido inteiro: os volantes saem do socket em streaming e cada bloco conferido
+        # volta como um chunk. O relatório vai nos trailers (X-Tickets, X-Prize...).
+        self.close_connection = True  # corpo pode ficar por ler depois de um erro
+        url = urlparse(self.path)
+        if url.path != "/score": return self._send(404, "use POST /score")
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        by_slug = {cfg['slug']: g for g, cfg in BASE_CONFIG.items()}
+        game = by_slug.get(q.get('game', ''), q.get('game'))
+        if game not in BASE_CONFIG: return self._send(400, f"game deve ser um de: {', '.join(sorted(by_slug))}")
+        out = ChunkedResponse(self)
+        try:
+            start, end = (int(q[k]) if q.get(k) else None for k in ('start', 'end'))
+            chunked = 'chunked' in (self.headers.get('Transfer-Encoding') or '').lower()
+            body = io.BufferedReader(RequestBody(self.rfile, int(self.headers.get('Content-Length') or 0), chunked))
+            head = body.peek(64).lstrip(b'\xef\xbb\xbf \t\r\n')[:1]
+            name = 'body.json' if head == b'[' else 'body.jsonl' if head == b'{' else 'body.csv'
+            tickets = iter_tickets(body, name, BASE_CONFIG[game]['range'])
+            rep = write_results(out, game, tickets, start=start, end=end, workers=self.workers)
+            out.finish(rep)
+        except Exception as e:
+            if out.started: return  # status já enviado: fecha sem o chunk final, o cliente vê a resposta truncada
+            if isinstance(e, (ValueError, KeyError, TypeError)): return self._send(400, str(e))
+            print(f"Erro em /score: {e!r}", file=sys.stderr)
+            self._send(500, f"erro interno: {type(e).__name__}")
+
+def serve(port, host="127.0.0.1", workers=None):
+    ScoreHandler.workers = workers
+    srv = ThreadingHTTPServer((host, port), ScoreHandler)
+    print(f"Conferência em lote em http://{host}:{srv.server_port}/score", file=sys.stderr)
+    return srv
+
+# --- CLI ---
+
+def main(argv=None):
+    by_slug = {cfg['slug']: g for g, cfg in BASE_CONFIG.items()}
+    ap = argparse.ArgumentParser(prog="python -m loterias.batch", description="Confere arquivos de volantes contra os sorteios gravados.")
+    ap.add_argument('tickets', nargs='?', help="CSV (dezenas por linha, coluna id/nome opcional), JSON ou JSONL")
+    ap.add_argument('--game', choices=sorted(by_slug), default='megasena')
+    ap.add_argument('--start', type=int, help="primeiro concurso (padrão: todos)")
+    ap.add_argument('--end', type=int, help="último concurso")
+    ap.add_argument('--out', help="CSV de saída (padrão: stdout)")
+    ap.add_argument('--workers', type=int, default=default_workers())
+    ap.add_argument('--chunk', type=int, help="volantes por bloco (padrão: automático)")
+    ap.add_argument('--serve', type=int, metavar='PORT', help="sobe o serviço HTTP em vez de conferir um arquivo")
+    ap.add_argument('--host', default="127.0.0.1")
+    ap.add_argument('--db', help="caminho do banco (padrão: LOTERIAS_DB ou loterias.db)")
+    args = ap.parse_args(argv)
+    if args.db: os.environ['LOTERIAS_DB'] = args.db
+    init_db()
+    if args.serve is not None:
+        srv = serve(args.serve, args.host, args.workers)
+        try: srv.serve_forever()
+        except KeyboardInterrupt: pass
+        return 0
+    if not args.tickets: ap.error("informe o arquivo de volantes ou --serve")
+    game = by_slug[args.game]
+    out = open(args.out, 'w', newline='', encoding='utf-8') if args.out else sys.stdout
+    try:
+        with open(args.tickets, 'rb') as f:
+            rep = write_results(out, game, iter_tickets(f, args.tickets, BASE_CONFIG[game]['range']),
+                                start=args.start, end=args.end, workers=args.workers, chunk=args.chunk)
+    finally:
+        if args.out: out.close()
+    print(format_report(rep), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
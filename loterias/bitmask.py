@@ -0,0 +1,58 @@
+import numpy as np
+
+# --- Motor de acertos por bitmask ---
+# Cada sorteio/volante vira uma linha de palavras uint64 (bit n = dezena n).
+# Acertos = popcount(volante & sorteio), calculado para todos os pares de uma vez.
+
+WORD_BITS = 64
+CHUNK_CELLS = 4_000_000  # limite de células (volantes x sorteios) por bloco
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(a):
+        return np.bitwise_count(a)
+else:
+    _POP8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(a):
+        a = np.ascontiguousarray(a, dtype=np.uint64)
+        return _POP8[a.view(np.uint8)].reshape(a.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def n_words(num_range):
+    return num_range // WORD_BITS + 1
+
+def encode_matrix(nums, num_range):
+    """Matriz (n, k) de dezenas -> matriz (n, palavras) uint64. Zeros (colunas vazias) são ignorados."""
+    nums = np.asarray(nums)
+    if nums.dtype.kind not in 'iu': nums = nums.astype(np.int64)
+    if nums.ndim == 1: nums = nums.reshape(1, -1)
+    bits = np.left_shift(np.uint64(1), (nums % WORD_BITS).astype(np.uint64))
+    bits[(nums <= 0) | (nums > num_range)] = 0
+    out = np.empty((nums.shape[0], n_words(num_range)), dtype=np.uint64)
+    if out.shape[1] == 1: np.bitwise_or.reduce(bits, axis=1, out=out[:, 0])
+    else:
+        word = nums // WORD_BITS
+        for w in range(out.shape[1]): np.bitwise_or.reduce(np.where(word == w, bits, np.uint64(0)), axis=1, out=out[:, w])
+    return out
+
+def encode_tickets(tickets, num_range):
+    """Lista de volantes (tamanhos variados) -> matriz (n, palavras) uint64."""
+    width = max((len(t) for t in tickets), default=0)
+    padded = np.zeros((len(tickets), width), dtype=np.int64)
+    for i, t in enumerate(tickets): padded[i, :len(t)] = t
+    return encode_matrix(padded, num_range)
+
+def decode_mask(mask):
+    mask = np.asarray(mask, dtype=np.uint64).ravel()
+    return [w * WORD_BITS + b for w, word in enumerate(mask) for b in range(WORD_BITS) if (int(word) >> b) & 1]
+
+def hit_counts(ticket_masks, draw_masks):
+    """Matriz (volantes, sorteios) uint8 de acertos, em blocos para limitar a memória."""
+    ticket_masks, draw_masks = np.asarray(ticket_masks, dtype=np.uint64), np.asarray(draw_masks, dtype=np.uint64)
+    n_t, n_d = ticket_masks.shape[0], draw_masks.shape[0]
+    out = np.zeros((n_t, n_d), dtype=np.uint8)
+    if n_t == 0 or n_d == 0: return out
+    step = max(1, CHUNK_CELLS // n_d)
+    for s in range(0, n_t, step):
+        block = ticket_masks[s:s + step, None, :] & draw_masks[None, :, :]
+        out[s:s + step] = popcount(block).sum(axis=-1, dtype=np.uint8)
+    return out
@@ -0,0 +1,146 @@
+import importlib.util
+import io
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from loterias.cache import draw_cache
+from loterias.config import BASE_CONFIG, draw_columns
+from loterias.db import db_get_draws, db_get_prizes, db_save_bulk, draw_records, game_id
+from loterias.metrics import timed
+
+# --- Importação/exportação em lote (CSV e Parquet) ---
+# Esquema conhecido (o mesmo do db_megasena.csv): Concurso, Data, D1..Dk e, por faixa,
+# "Ganhadores N acertos" / "Rateio N acertos" (ou o nome da faixa: "Rateio Quina").
+# Lê só as colunas necessárias com tipos explícitos, sem a varredura heurística de process_dataframe.
+# etl/ingest (requests, lxml) são importados só ao importar arquivos: a exportação fica leve para a barra lateral.
+
+DRAW_DTYPES = {'Concurso': 'int32', **{f'D{i}': 'int16' for i in range(1, 16)}}
+_TIER = re.compile(r'^(ganhadores|rateio)\s+(\d+)\s+acertos$')
+_MONEY_BR = re.compile(r'[R$\s.]')
+
+def has_parquet():
+    return any(importlib.util.find_spec(m) is not None for m in ('pyarrow', 'fastparquet'))
+
+def _require_parquet():
+    if not has_parquet(): raise ImportError("Parquet exige o pacote pyarrow (pip install pyarrow).")
+
+def prize_columns(columns, game_name):
+    """{coluna: ('ganhadores'|'rateio', acertos)} para as faixas premiadas da modalidade."""
+    from loterias.etl import normalize_text
+    cfg = BASE_CONFIG[game_name]
+    by_label = {normalize_text(v): k for k, v in cfg['labels'].items()}
+    out = {}
+    for col in columns:
+        txt = normalize_text(col).strip()
+        m = _TIER.match(txt)
+        if m: kind, hits = m.group(1), int(m.group(2))
+        else:
+            kind, _, label = txt.partition(' ')
+            if kind not in ('ganhadores', 'rateio') or label not in by_label: continue
+            hits = by_label[label]
+        if hits in cfg['est_prize']: out[col] = (kind, hits)
+    return out
+
+def parse_money(s):
+    """'R$39.158,92' -> 39158.92; números já decimais ('748.36', 748.36) passam direto."""
+    txt = s.astype(str).str.strip()
+    br = txt.str.contains(',', regex=False) | txt.str.startswith('R$')
+    txt = txt.where(~br, txt.str.replace(_MONEY_BR, '', regex=True).str.replace(',', '.', regex=False))
+    return pd.to_numeric(txt, errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+
+def parse_dates(s):
+    # ISO (export do app, db_megasena.csv) ou dd/mm/aaaa (arquivos da Caixa), decidido pela primeira data.
+    first = next((x for x in s.astype(str) if x.strip()), '')
+    if re.match(r'^\d{4}-', first): return pd.to_datetime(s, format='ISO8601', errors='coerce')
+    return pd.to_datetime(s, dayfirst=True, errors='coerce')
+
+def _split(df, game_name, with_prizes):
+    cols = ['Concurso', 'Data'] + draw_columns(game_name)
+    missing = [c for c in cols if c not in df.columns]
+    if missing: raise ValueError(f"Colunas ausentes: {', '.join(missing)}")
+    draws = df[cols].copy()
+    if not pd.api.types.is_datetime64_any_dtype(draws['Data']): draws['Data'] = parse_dates(draws['Data'])
+    prizes = None
+    if with_prizes:
+        tiers = prize_columns(df.columns, game_name)
+        conc = draws['Concurso'].to_numpy(dtype=np.int64)
+        parts = []
+        for hits in sorted({h for _, h in tiers.values()}):
+            wcol = next((c for c, t in tiers.items() if t == ('ganhadores', hits)), None)
+            rcol = next((c for c, t in tiers.items() if t == ('rateio', hits)), None)
+            if rcol is None: continue
+            winners = pd.to_numeric(df[wcol], errors='coerce').fillna(0).to_numpy(dtype=np.int64) if wcol else np.zeros(len(df), np.int64)
+            parts.append(pd.DataFrame({'concurso': conc, 'hits': hits, 'winners': winners, 'payout': parse_money(df[rcol])}))
+        prizes = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['concurso', 'hits', 'winners', 'payout'])
+    return draws.sort_values('Concurso', ascending=False, ignore_index=True), prizes
+
+def _usecols(game_name, with_prizes):
+    base = {'Concurso', 'Data', *draw_columns(game_name)}
+    if not with_prizes: return lambda c: c in base
+    return lambda c: c in base or bool(prize_columns([c], game_name))
+
+@timed(rows=lambda res, *a, **k: len(res[0]))
+def read_draws_csv(src, game_name, with_prizes=True):
+    """CSV no esquema do db_megasena.csv -> (sorteios, rateios). Sem rateios, lê só Concurso, Data e D1..Dk."""
+    k = BASE_CONFIG[game_name]['draw']
+    dtype = {c: t for c, t in DRAW_DTYPES.items() if c == 'Concurso' or int(c[1:]) <= k}
+    df = pd.read_csv(src, usecols=_usecols(game_name, with_prizes), dtype={**dtype, 'Data': str}, keep_default_na=False)
+    return _split(df, game_name, with_prizes)
+
+@timed(rows=lambda res, *a, **k: len(res[0]))
+def read_draws_parquet(src, game_name, with_prizes=True):
+    _require_parquet()
+    if with_prizes: df = pd.read_parquet(src)
+    else: df = pd.read_parquet(src, columns=['Concurso', 'Data', *draw_columns(game_name)])
+    return _split(df, game_name, with_prizes)
+
+def read_draws_file(src, filename, game_name, with_prizes=True):
+    if filename.lower().endswith(('.parquet', '.pq')): return read_draws_parquet(src, game_name, with_prizes)
+    return read_draws_csv(src, game_name, with_prizes)
+
+def save_bulk(draws, prizes, game_name):
+    prize_recs = []
+    if prizes is not None and len(prizes):
+        prize_recs = [(game_id(game_name), int(c), int(h), int(w), float(p)) for c, h, w, p in
+                      zip(prizes['concurso'], prizes['hits'], prizes['winners'], prizes['payout'])]
+    db_save_bulk(draw_records(draws, game_name), prize_recs)
+    if len(draws): draw_cache.after_save(game_name, draws['Concurso'])
+
+@timed(rows=lambda rep, *a, **k: rep.rows)
+def import_draws(src, filename, game_name):
+    from loterias.ingest import IngestReport
+    t0 = time.perf_counter()
+    draws, prizes = read_draws_file(src, filename, game_name)
+    ok = (draws['Concurso'] > 0) & draws['Data'].notna()
+    if prizes is not None: prizes = prizes[prizes['concurso'].isin(draws.loc[ok, 'Concurso'])]
+    save_bulk(draws[ok], prizes, game_name)
+    return IngestReport(int(ok.sum()), int((~ok).sum()), time.perf_counter() - t0)
+
+# --- Exportação ---
+
+def export_frame(game_name):
+    """Sorteios e rateios gravados no mesmo esquema aceito pela importação."""
+    df = db_get_draws(game_name)
+    cols = ['Concurso', 'Data'] + draw_columns(game_name)
+    if df.empty: return pd.DataFrame(columns=cols)
+    out = df[cols].sort_values('Concurso', ignore_index=True)
+    out['Data'] = out['Data'].dt.strftime('%Y-%m-%d')
+    conc, hits, winners, payout = db_get_prizes(game_name)
+    if len(conc):
+        p = pd.DataFrame({'Concurso': conc, 'hits': hits, 'Ganhadores': winners, 'Rateio': payout})
+        wide = p.pivot(index='Concurso', columns='hits', values=['Ganhadores', 'Rateio'])
+        for h in sorted(wide.columns.get_level_values(1).unique(), reverse=True):
+            out[f'Ganhadores {h} acertos'] = out['Concurso'].map(wide[('Ganhadores', h)]).fillna(0).astype(np.int64)
+            out[f'Rateio {h} acertos'] = out['Concurso'].map(wide[('Rateio', h)]).fillna(0.0)
+    return out
+
+def export_draws(game_name, fmt='csv'):
+    df = export_frame(game_name)
+    if fmt == 'parquet':
+        _require_parquet()
+        buf = io.BytesIO(); df.to_parquet(buf, index=False)
+        return buf.getvalue()
+    return df.to_csv(index=False).encode('utf-8')
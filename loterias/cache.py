@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from loterias.db import db_get_draw_arrays, db_get_last_concurso
+
+# --- Cache colunar de sorteios ---
+# Um conjunto de arrays por modalidade, compartilhado pelo processo inteiro (todas as sessões).
+# Após download/upload, só os concursos novos são anexados; regravações de concursos antigos invalidam.
+
+MAX_BYTES = 64 * 1024 * 1024
+REVALIDATE_SECONDS = 30.0  # checa MAX(concurso) no banco no máximo a cada N segundos
+
+class DrawSet(NamedTuple):
+    concurso: np.ndarray  # int32, crescente
+    date: np.ndarray      # datetime64[D]
+    numbers: np.ndarray   # int8 (n, draw)
+
+    @property
+    def nbytes(self):
+        return self.concurso.nbytes + self.date.nbytes + self.numbers.nbytes
+
+    @property
+    def last(self):
+        return int(self.concurso[-1]) if len(self.concurso) else None
+
+    def append(self, other):
+        return DrawSet(np.concatenate([self.concurso, other.concurso]), np.concatenate([self.date, other.date]),
+                       np.concatenate([self.numbers, other.numbers]))
+
+    def to_frame(self):
+        # Mesmo formato de db_get_draws: concurso decrescente, colunas Concurso, Data, D1..Dk.
+        df = pd.DataFrame({'Concurso': self.concurso[::-1].astype(np.int64),
+                           'Data': self.date[::-1].astype('datetime64[ns]')})
+        for i in range(self.numbers.shape[1]): df[f'D{i + 1}'] = self.numbers[::-1, i].astype(np.int64)
+        return df
+
+class DrawCache:
+    def __init__(self, max_bytes=MAX_BYTES, revalidate_seconds=REVALIDATE_SECONDS):
+        self.max_bytes, self.revalidate_seconds = max_bytes, revalidate_seconds
+        self._entries = OrderedDict()  # game -> (DrawSet, checado_em)
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.extends = self.invalidations = self.evictions = 0
+
+    def get(self, game_name):
+        with self._lock:
+            entry = self._entries.get(game_name)
+            if entry is None:
+                self.misses += 1
+                ds = DrawSet(*db_get_draw_arrays(game_name))
+                self._store(game_name, ds)
+                return ds
+            self.hits += 1
+            self._entries.move_to_end(game_name)
+            ds, checked = entry
+            if time.monotonic() - checked > self.revalidate_seconds:
+                last = db_get_last_concurso(game_name)
+                if last is not None and (ds.last is None or last > ds.last): return self.extend(game_name)
+                self._entries[game_name] = (ds, time.monotonic())
+            return ds
+
+    def frame(self, game_name):
+        return self.get(game_name).to_frame()
+
+    def extend(self, game_name):
+        """Anexa apenas os concursos posteriores ao último em cache."""
+        with self._lock:
+            entry = self._entries.get(game_name)
+            if entry is None: return self.get(game_name)
+            ds = entry[0]
+            new = DrawSet(*db_get_draw_arrays(game_name, after=ds.last))
+            if len(new.concurso):
+                self.extends += 1
+                ds = ds.append(new)
+            self._store(game_name, ds)
+            return ds
+
+    def after_save(self, game_name, concursos):
+        """Chamado após gravar sorteios: anexa se só vieram concursos novos, senão invalida."""
+        with self._lock:
+            entry = self._entries.get(game_name)
+            if entry is None: return
+            last = entry[0].last
+            if last is not None and len(concursos) and int(np.min(concursos)) > last: self.extend(game_name)
+            else: self.invalidate(game_name)
+
+    def invalidate(self, game_name=None):
+        with self._lock:
+            names = [game_name] if game_name else list(self._entries)
+            for g in names:
+                if self._entries.pop(g, None) is not None: self.invalidations += 1
+
+    def _store(self, game_name, ds):
+        self._entries[game_name] = (ds, time.monotonic())
+        self._entries.move_to_end(game_name)
+        while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            self._entries.popitem(last=False); self.evictions += 1
+
+    @property
+    def nbytes(self):
+        return sum(ds.nbytes for ds, _ in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                    "extends": self.extends, "invalidations": self.invalidations, "evictions": self.evictions,
+                    "games": list(self._entries), "bytes": self.nbytes}
+
+draw_cache = DrawCache()
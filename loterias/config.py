@@ -0,0 +1,32 @@
+# --- Constantes ---
+DB_FILE = 'loterias.db'
+
+BASE_CONFIG = {
+    "Mega-Sena": {
+        "id": 1, "slug": "megasena",
+        "url_zip": "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade=Mega-Sena",
+        "range": 60, "draw": 6, "cost": 5.00, "min_win": 4, 
+        "cols_pc": 10, "cols_mobile": 5,
+        "labels": {4: "Quadra", 5: "Quina", 6: "Sena"},
+        "est_prize": {4: 1000, 5: 50000, 6: 15000000}
+    },
+    "Quina": {
+        "id": 2, "slug": "quina",
+        "url_zip": "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade=Quina",
+        "range": 80, "draw": 5, "cost": 2.50, "min_win": 2, 
+        "cols_pc": 10, "cols_mobile": 5,
+        "labels": {2: "Duque", 3: "Terno", 4: "Quadra", 5: "Quina"},
+        "est_prize": {2: 4.00, 3: 100, 4: 8000, 5: 5000000}
+    },
+    "Lotofácil": {
+        "id": 3, "slug": "lotofacil",
+        "url_zip": "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade=Lotofacil",
+        "range": 25, "draw": 15, "cost": 3.00, "min_win": 11, 
+        "cols_pc": 5, "cols_mobile": 5,
+        "labels": {11: "11 pts", 12: "12 pts", 13: "13 pts", 14: "14 pts", 15: "15 pts"},
+        "est_prize": {11: 6, 12: 12, 13: 30, 14: 1500, 15: 1500000}
+    }
+}
+
+def draw_columns(game_name):
+    return [f'D{i}' for i in range(1, BASE_CONFIG[game_name]['draw'] + 1)]
@@ -0,0 +1,371 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from loterias.bitmask import WORD_BITS, encode_tickets
+from loterias.config import BASE_CONFIG, DB_FILE
+from loterias.metrics import timed
+
+# --- Conexões ---
+# Um pool por arquivo de banco, compartilhado por todas as threads de script do Streamlit.
+# SQLite aceita vários leitores em WAL, mas só um escritor: as escritas passam por um lock.
+
+POOL_SIZE = 4
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA foreign_keys=ON",
+)
+
+class ConnectionPool:
+    def __init__(self, db_file, size=POOL_SIZE, timeout=10.0):
+        self.db_file, self.size, self.timeout = db_file, size, timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=self.timeout, check_same_thread=False, cached_statements=256)
+        for p in PRAGMAS: conn.execute(p)
+        return conn
+
+    def _acquire(self):
+        try: return self._idle.get_nowait()
+        except queue.Empty: pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._connect()
+        return self._idle.get(timeout=self.timeout)
+
+    @contextmanager
+    def read(self):
+        conn = self._acquire()
+        try: yield conn
+        finally: self._idle.put(conn)
+
+    @contextmanager
+    def write(self):
+        # Uma transação: commit ao sair, rollback em caso de erro.
+        with self._write_lock, self.read() as conn:
+            with conn: yield conn
+
+    def close(self):
+        with self._lock:
+            while True:
+                try: self._idle.get_nowait().close()
+                except queue.Empty: break
+            self._created = 0
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def db_path():
+    return os.environ.get('LOTERIAS_DB', DB_FILE)
+
+def get_pool(db_file=None):
+    db_file = db_file or db_path()
+    pool = _pools.get(db_file)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_file)
+            if pool is None:
+                pool = _pools[db_file] = ConnectionPool(db_file)
+    return pool
+
+# --- Consultas ---
+# draws guarda por concurso o id inteiro da modalidade (BASE_CONFIG[...]['id']), a data ISO e as dezenas
+# na ordem do sorteio (1 byte cada); os bitmasks saem delas na leitura (encode_matrix). A chave (game_id, concurso)
+# é o próprio índice clusterizado da tabela (WITHOUT ROWID); idx_draws_game_date atende os filtros por data.
+# prizes usa a mesma chave de modalidade.
+
+SCHEMA_VERSION = 3
+SQL_CREATE_DRAWS = '''CREATE TABLE IF NOT EXISTS draws (
+                        game_id INTEGER NOT NULL, concurso INTEGER NOT NULL, date TEXT, numbers BLOB NOT NULL,
+                        PRIMARY KEY (game_id, concurso)) WITHOUT ROWID'''
+SQL_CREATE_PRIZES = '''CREATE TABLE IF NOT EXISTS prizes (
+                        game_id INTEGER NOT NULL, concurso INTEGER NOT NULL, hits INTEGER NOT NULL, winners INTEGER, payout REAL,
+                        PRIMARY KEY (game_id, concurso, hits)) WITHOUT ROWID'''
+SQL_INSERT_DRAW = "INSERT OR REPLACE INTO draws (game_id, concurso, date, numbers) VALUES (?,?,?,?)"
+SQL_INSERT_PRIZE = "INSERT OR REPLACE INTO prizes (game_id, concurso, hits, winners, payout) VALUES (?,?,?,?,?)"
+SQL_SELECT_PRIZES = "SELECT concurso, hits, winners, payout FROM prizes WHERE game_id = ? ORDER BY concurso, hits"
+SQL_LAST_CONCURSO = "SELECT MAX(concurso) FROM draws WHERE game_id = ?"
+USER_GAME_COLS = "id, game_type, name, numbers, created_at, cost, mask"
+SQL_INSERT_USER_GAME = f"INSERT INTO user_games ({USER_GAME_COLS}) VALUES (?,?,?,?,?,?,?)"
+SQL_SELECT_USER_GAMES = "SELECT id, game_type, name, created_at, cost, mask, numbers FROM user_games WHERE game_type = ? ORDER BY created_at DESC, id DESC"
+SQL_SELECT_ALL_USER_GAMES = "SELECT id, game_type, name, created_at, cost, mask, numbers FROM user_games ORDER BY created_at DESC, id DESC"
+SQL_COUNT_USER_GAMES = "SELECT COUNT(*) FROM user_games WHERE game_type = ?"
+GAME_ID_WIDTH = 20  # %Y%m%d%H%M%S%f: passa do limite do INTEGER do SQLite, então o máximo é comparado como texto
+SQL_MAX_USER_GAME_ID = f"SELECT MAX(id) FROM user_games WHERE length(id) = {GAME_ID_WIDTH} AND id NOT GLOB '*[^0-9]*'"
+SQL_DELETE_USER_GAME = "DELETE FROM user_games WHERE id = ?"
+
+def game_id(game_name):
+    return BASE_CONFIG[game_name]['id']
+
+def draw_filter(game_name, since=None, start=None, end=None, after=None):
+    """Cláusula WHERE e parâmetros: data mínima (since) e faixa de concursos, resolvidas pelos índices."""
+    sql, params = "game_id = ?", [game_id(game_name)]
+    if since is not None and not pd.isna(since): sql += " AND date >= ?"; params.append(pd.Timestamp(since).strftime('%Y-%m-%d'))
+    if start is not None: sql += " AND concurso >= ?"; params.append(int(start))
+    if end is not None: sql += " AND concurso <= ?"; params.append(int(end))
+    if after is not None: sql += " AND concurso > ?"; params.append(int(after))
+    return sql, tuple(params)
+
+# --- Banco de Dados ---
+
+def init_db():
+    with get_pool().write() as conn:
+        conn.execute(SQL_CREATE_DRAWS)
+        conn.execute('''CREATE TABLE IF NOT EXISTS user_games (
+                        id TEXT PRIMARY KEY, game_type TEXT, name TEXT,
+                        numbers TEXT, created_at DATE, cost REAL, mask BLOB)''')
+        conn.execute(SQL_CREATE_PRIZES)
+        conn.execute('''CREATE TABLE IF NOT EXISTS latest_results (
+                        game TEXT PRIMARY KEY, payload TEXT, fetched_at REAL)''')
+        migrate(conn)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_user_games_type_created ON user_games (game_type, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_draws_game_date ON draws (game_id, date)")
+
+# --- Migrações ---
+# Versão do esquema em PRAGMA user_version. Cada passo roda numa transação junto com o novo número,
+# então uma migração interrompida recomeça do mesmo ponto na próxima abertura.
+
+def migrate(conn):
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION: return
+    rewritten = False
+    for v, step in MIGRATIONS:
+        if conn.in_transaction: conn.commit()
+        conn.execute("BEGIN IMMEDIATE")  # outro processo pode estar migrando o mesmo arquivo: relê a versão com o lock
+        if conn.execute("PRAGMA user_version").fetchone()[0] < v:
+            rewritten |= bool(step(conn))
+            conn.execute(f"PRAGMA user_version = {v}")
+        conn.commit()
+    if rewritten: conn.execute("VACUUM")  # devolve ao disco o espaço da tabela antiga
+
+def migrate_user_games(conn):
+    # Bases antigas: só a coluna JSON. Cria a coluna de bitmask e preenche a partir dela.
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(user_games)")]
+    if 'mask' not in cols: conn.execute("ALTER TABLE user_games ADD COLUMN mask BLOB")
+    rows = conn.execute("SELECT id, game_type, numbers FROM user_games WHERE mask IS NULL").fetchall()
+    if rows:
+        conn.executemany("UPDATE user_games SET mask = ? WHERE id = ?",
+                         [(pack_numbers(json.loads(nums), game_type), gid) for gid, game_type, nums in rows])
+
+def migrate_draws_compact(conn):
+    # Esquema antigo: game TEXT e d1..d15 INTEGER (zeros nas colunas que a modalidade não usa).
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(draws)")]
+    if 'game' not in cols: return False
+    conn.execute("ALTER TABLE draws RENAME TO draws_v1")
+    conn.execute(SQL_CREATE_DRAWS)
+    for game_name, cfg in BASE_CONFIG.items():
+        k = cfg['draw']
+        rows = conn.execute(f"SELECT concurso, date, {', '.join(f'd{i}' for i in range(1, k + 1))} FROM draws_v1 WHERE game = ?",
+                            (game_name,)).fetchall()
+        if not rows: continue
+        conc, dates, *nums = zip(*rows)
+        conn.executemany(SQL_INSERT_DRAW, pack_draws(game_name, conc, [d if d is None else str(d)[:10] for d in dates], np.array(nums).T))
+    conn.execute("DROP TABLE draws_v1")
+    return True
+
+def migrate_game_ids(conn):
+    # Versão 2: draws ainda com a coluna mask (nunca lida) e prizes chaveada pelo nome da modalidade.
+    rewritten = False
+    if 'mask' in [r[1] for r in conn.execute("PRAGMA table_info(draws)")]:
+        conn.execute("ALTER TABLE draws RENAME TO draws_v2")
+        conn.execute(SQL_CREATE_DRAWS)
+        conn.execute("INSERT INTO draws (game_id, concurso, date, numbers) SELECT game_id, concurso, date, numbers FROM draws_v2")
+        conn.execute("DROP TABLE draws_v2")
+        rewritten = True
+    if 'game' in [r[1] for r in conn.execute("PRAGMA table_info(prizes)")]:
+        conn.execute("ALTER TABLE prizes RENAME TO prizes_v1")
+        conn.execute(SQL_CREATE_PRIZES)
+        conn.executemany("INSERT INTO prizes SELECT ?, concurso, hits, winners, payout FROM prizes_v1 WHERE game = ?",
+                         [(cfg['id'], game_name) for game_name, cfg in BASE_CONFIG.items()])
+        conn.execute("DROP TABLE prizes_v1")
+        rewritten = True
+    return rewritten
+
+MIGRATIONS = [(1, migrate_user_games), (2, migrate_draws_compact), (3, migrate_game_ids)]
+
+# --- Sorteios ---
+
+def pack_draws(game_name, concursos, dates, nums):
+    """Registros da tabela draws a partir de concursos, datas ISO e matriz (n, draw) de dezenas."""
+    cfg = BASE_CONFIG[game_name]
+    nums = np.asarray(nums, dtype=np.uint8).reshape(len(concursos), cfg['draw'])
+    gid = cfg['id']
+    return [(gid, int(c), d, n.tobytes()) for c, d, n in zip(concursos, dates, nums)]
+
+def unpack_draws(blobs, k):
+    """BLOBs de dezenas (1 byte cada, ordem do sorteio) -> matriz (n, k) int8."""
+    if not blobs: return np.empty((0, k), dtype=np.int8)
+    return np.frombuffer(b''.join(blobs), dtype=np.int8).reshape(len(blobs), k).copy()
+
+def draw_records(df, game_name):
+    cols = [f'D{i}' for i in range(1, BASE_CONFIG[game_name]['draw'] + 1)]
+    return pack_draws(game_name, df['Concurso'].to_numpy(dtype=np.int64), df['Data'].dt.strftime('%Y-%m-%d').tolist(),
+                      df[cols].to_numpy(dtype=np.int64))
+
+@timed(rows=lambda res, records, *a, **k: len(records))
+def db_save_draw_records(records, batch_size=5000):
+    """Grava registros de pack_draws (game_id, concurso, date, dezenas) numa transação, em lotes."""
+    with get_pool().write() as conn:
+        for s in range(0, len(records), batch_size):
+            conn.executemany(SQL_INSERT_DRAW, records[s:s + batch_size])
+
+@timed(rows=lambda res, records, *a, **k: len(records))
+def db_save_bulk(draw_recs, prize_recs, batch_size=5000):
+    """Sorteios e rateios (game_id, concurso, acertos, ganhadores, valor) na mesma transação."""
+    with get_pool().write() as conn:
+        for s in range(0, len(draw_recs), batch_size):
+            conn.executemany(SQL_INSERT_DRAW, draw_recs[s:s + batch_size])
+        for s in range(0, len(prize_recs), batch_size):
+            conn.executemany(SQL_INSERT_PRIZE, prize_recs[s:s + batch_size])
+
+def db_save_draws(df, game_name, batch_size=5000):
+    db_save_draw_records(draw_records(df, game_name), batch_size)
+
+def _select_draws(game_name, order, **filters):
+    where, params = draw_filter(game_name, **filters)
+    with get_pool().read() as conn:
+        rows = conn.execute(f"SELECT concurso, date, numbers FROM draws WHERE {where} ORDER BY concurso {order}", params).fetchall()
+    if not rows: return [], [], []
+    return zip(*rows)
+
+@timed(rows=lambda df, *a, **k: len(df))
+def db_get_draws(game_name, since=None, start=None, end=None):
+    """Sorteios em concurso decrescente (Concurso, Data, D1..Dk). Filtros de data (since) e de concursos
+    (start/end) vão para o SQL: só as linhas pedidas são lidas."""
+    k = BASE_CONFIG[game_name]['draw']
+    conc, dates, blobs = _select_draws(game_name, "DESC", since=since, start=start, end=end)
+    nums = unpack_draws(list(blobs), k)
+    df = pd.DataFrame({'Concurso': np.array(conc, dtype=np.int64), 'Data': pd.to_datetime(pd.Series(dates, dtype=object), format='%Y-%m-%d')})
+    for i in range(k): df[f'D{i + 1}'] = nums[:, i].astype(np.int64)
+    return df
+
+@timed(rows=lambda res, *a, **k: len(res[0]))
+def db_get_draw_arrays(game_name, after=None, start=None, end=None):
+    """Sorteios em ordem crescente de concurso como arrays (concursos, datas, matriz de dezenas).
+    Com `after`, traz só os concursos posteriores a ele; start/end limitam a faixa de concursos."""
+    k = BASE_CONFIG[game_name]['draw']
+    conc, dates, blobs = _select_draws(game_name, "ASC", after=after, start=start, end=end)
+    return (np.array(conc, dtype=np.int32), np.array(dates, dtype='datetime64[D]'), unpack_draws(list(blobs), k))
+
+def db_get_prizes(game_name):
+    """Rateios gravados como arrays (concurso, acertos, ganhadores, valor pago a cada ganhador)."""
+    with get_pool().read() as conn:
+        rows = conn.execute(SQL_SELECT_PRIZES, (game_id(game_name),)).fetchall()
+    if not rows: return np.empty(0, np.int32), np.empty(0, np.int8), np.empty(0, np.int64), np.empty(0, np.float64)
+    conc, hits, winners, payout = zip(*rows)
+    return (np.array(conc, dtype=np.int32), np.array(hits, dtype=np.int8),
+            np.array(winners, dtype=np.int64), np.array(payout, dtype=np.float64))
+
+def db_get_last_concurso(game_name):
+    with get_pool().read() as conn:
+        return conn.execute(SQL_LAST_CONCURSO, (game_id(game_name),)).fetchone()[0]
+
+# --- Carteira ---
+# Dezenas gravadas como bitmask (palavras uint64 little-endian num BLOB; a Quina passa de 64 bits).
+# A coluna JSON `numbers` continua sendo escrita para bases abertas por versões antigas.
+
+def pack_numbers(numbers, game_type):
+    return encode_tickets([numbers], BASE_CONFIG[game_type]['range'])[0].astype('<u8').tobytes()
+
+def unpack_masks(blobs):
+    """BLOBs de bitmask -> lista de listas de dezenas, decodificadas de uma vez."""
+    if not blobs: return []
+    width = max(len(b) for b in blobs)
+    raw = np.frombuffer(b''.join(b.ljust(width, b'\0') for b in blobs), dtype=np.uint8).reshape(len(blobs), width)
+    rows, nums = np.nonzero(np.unpackbits(raw, axis=1, bitorder='little'))
+    return [a.tolist() for a in np.split(nums, np.searchsorted(rows, np.arange(1, len(blobs))))]
+
+def user_game_masks(games, game_type):
+    """Matriz (jogos, palavras) uint64 dos jogos lidos por db_get_user_games."""
+    words = BASE_CONFIG[game_type]['range'] // WORD_BITS + 1
+    if not games: return np.zeros((0, words), dtype=np.uint64)
+    raw = b''.join(g['mask'].ljust(words * 8, b'\0')[:words * 8] for g in games)
+    return np.frombuffer(raw, dtype='<u8').reshape(len(games), words).astype(np.uint64)
+
+_last_gid = 0
+_gid_lock = threading.Lock()
+
+def new_game_ids(n=1, floor=0):
+    # Timestamp em microssegundos, sempre crescente dentro do processo (sem colisão em laços rápidos).
+    # `floor` é o maior id já gravado no banco, para não colidir com outros processos.
+    global _last_gid
+    with _gid_lock:
+        start = max(int(datetime.now().strftime("%Y%m%d%H%M%S%f")), _last_gid + 1, floor + 1)
+        _last_gid = start + n - 1
+        return [str(start + i) for i in range(n)]
+
+def user_game_record(gid, game_type, name, numbers, cost, date=None):
+    dt_save = date if date else datetime.now().strftime('%Y-%m-%d')
+    nums = sorted(int(n) for n in numbers)
+    return (gid, game_type, name, json.dumps(nums), dt_save, cost, pack_numbers(nums, game_type))
+
+def db_save_user_game(game_type, name, numbers, cost, date=None):
+    db_save_user_games([{"type": game_type, "nome": name, "nums": numbers, "cost": cost, "date": date}])
+
+def db_save_user_games(games, batch_size=5000):
+    """Grava vários jogos (dicts no formato do backup) numa única transação, com ids novos e sem colisão."""
+    games = list(games)
+    with get_pool().write() as conn:
+        conn.execute("BEGIN IMMEDIATE")  # trava de escrita antes de ler o maior id: outro processo espera a vez
+        floor = int(conn.execute(SQL_MAX_USER_GAME_ID).fetchone()[0] or 0)
+        ids = new_game_ids(len(games), floor)
+        records = [user_game_record(gid, g['type'], g['nome'], g['nums'], g['cost'], g.get('date'))
+                   for gid, g in zip(ids, games)]
+        for s in range(0, len(records), batch_size):
+            conn.executemany(SQL_INSERT_USER_GAME, records[s:s + batch_size])
+    return len(records)
+
+@timed(rows=lambda res, *a, **k: len(res))
+def db_get_user_games(game_type=None, with_masks=False, limit=None, offset=0):
+    # limit/offset: paginação feita no próprio SQLite (a página só lê e decodifica suas linhas).
+    sql, params = (SQL_SELECT_USER_GAMES, (game_type,)) if game_type else (SQL_SELECT_ALL_USER_GAMES, ())
+    if limit is not None: sql += " LIMIT ? OFFSET ?"; params += (int(limit), int(offset))
+    with get_pool().read() as conn:
+        rows = conn.execute(sql, params).fetchall() # Sem modalidade: pega tudo para backup
+    # Linhas gravadas por versões antigas depois da migração ainda não têm bitmask: usa o JSON.
+    rows = [r if r[5] is not None else r[:5] + (pack_numbers(json.loads(r[6]), r[1]), r[6]) for r in rows]
+    nums = unpack_masks([r[5] for r in rows])
+    games = [{"id": r[0], "type": r[1], "nome": r[2], "nums": n, "date": r[3], "cost": r[4]} for r, n in zip(rows, nums)]
+    if with_masks:
+        for g, r in zip(games, rows): g['mask'] = r[5]
+    return games
+
+def db_count_user_games(game_type):
+    with get_pool().read() as conn:
+        return conn.execute(SQL_COUNT_USER_GAMES, (game_type,)).fetchone()[0]
+
+def db_delete_user_game(gid):
+    db_delete_user_games([gid])
+
+def db_delete_user_games(gids):
+    with get_pool().write() as conn:
+        conn.executemany(SQL_DELETE_USER_GAME, [(g,) for g in gids])
+
+# --- Backup System ---
+def export_games_json():
+    games = db_get_user_games(None) # Pega de todas modalidades
+    return json.dumps(games, indent=2)
+
+def import_games_json(json_file):
+    try:
+        data = json.load(json_file)
+        # Salva novamente (vai gerar novos IDs para evitar colisão)
+        count = db_save_user_games(data)
+        return True, count
+    except Exception as e:
+        return False, str(e)
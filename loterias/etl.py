@@ -0,0 +1,141 @@
+import io
+import unicodedata
+
+import pandas as pd
+import requests
+import urllib3
+
+from loterias.cache import draw_cache
+from loterias.config import BASE_CONFIG
+from loterias.db import db_save_draws, db_get_last_concurso
+from loterias.metrics import timed
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+API_BASE = "https://servicebus2.caixa.gov.br/portaldeloterias/api"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+MAX_DELTA = 30  # acima disso, baixar o histórico completo sai mais barato que N requisições
+
+# --- ETL ---
+def normalize_text(text):
+    if not isinstance(text, str): return str(text)
+    return unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII').lower()
+
+def is_header_row(values):
+    row_values = [normalize_text(x) for x in values]
+    return 'concurso' in row_values and ('data' in row_values or 'data sorteio' in row_values)
+
+def column_name(col):
+    col_clean = normalize_text(col).strip()
+    if 'concurso' in col_clean: return 'Concurso'
+    elif 'data' in col_clean: return 'Data'
+    for i in range(20, 0, -1):  # do maior para o menor: "bola 1" não pode capturar "bola 15"
+        patterns = [f"bola {i}", f"bola{i}", f"dezena {i}", f"dezena{i}", f"{i}a dezena", f"{i} dezena"]
+        if any(p in col_clean for p in patterns): return f'D{i}'
+    return None
+
+@timed(rows=lambda df, *a, **k: len(df))
+def process_dataframe(df, game_name):
+    cfg = BASE_CONFIG[game_name]
+    start_row = -1
+    for i in range(min(20, len(df))):
+        if is_header_row(df.iloc[i].values):
+            start_row = i
+            df.columns = df.iloc[i]; break
+    if start_row >= 0: df = df.iloc[start_row + 1:].copy()
+
+    new_columns = {}
+    for col in df.columns:
+        name = column_name(col)
+        if name: new_columns[col] = name
+    df.rename(columns=new_columns, inplace=True)
+
+    try:
+        cols_draw = [f'D{i}' for i in range(1, cfg['draw'] + 1)]
+        required = ['Concurso', 'Data'] + cols_draw
+        if not all(c in df.columns for c in cols_draw):
+            if len(df.columns) >= len(required):
+                mapper = {df.columns[0]: 'Concurso', df.columns[1]: 'Data'}
+                for idx, c_name in enumerate(cols_draw): mapper[df.columns[2+idx]] = c_name
+                df.rename(columns=mapper, inplace=True)
+            else: return pd.DataFrame()
+        for c in cols_draw:
+            df[c] = df[c].astype(str).str.replace(r'[^\d]', '', regex=True)
+            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype(int)
+        df['Concurso'] = pd.to_numeric(df['Concurso'], errors='coerce').fillna(0).astype(int)
+        df['Data'] = pd.to_datetime(df['Data'], dayfirst=True, errors='coerce')
+        return df.dropna(subset=['Concurso']).sort_values('Concurso', ascending=True)
+    except: return pd.DataFrame()
+
+# --- Download ---
+
+def save_draws(df_clean, game_name):
+    db_save_draws(df_clean, game_name)
+    draw_cache.after_save(game_name, df_clean['Concurso'])
+
+@timed()
+def fetch_result(game_name, concurso=None, session=None, base_url=API_BASE, timeout=5):
+    """JSON de um concurso (ou do último, sem `concurso`) no endpoint de resultados."""
+    url = f"{base_url}/{BASE_CONFIG[game_name]['slug']}/" + (str(concurso) if concurso else "")
+    r = (session or requests).get(url, headers=HEADERS, verify=False, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+def result_to_row(js, game_name):
+    nums = sorted(int(d) for d in js['listaDezenas'])[:BASE_CONFIG[game_name]['draw']]
+    row = {"Concurso": int(js['numero']), "Data": js['dataApuracao']}
+    row.update({f'D{i}': n for i, n in enumerate(nums, 1)})
+    return row
+
+def results_to_dataframe(results, game_name):
+    df = pd.DataFrame([result_to_row(js, game_name) for js in results])
+    df['Data'] = pd.to_datetime(df['Data'], dayfirst=True, errors='coerce')
+    return df.sort_values('Concurso', ascending=True)
+
+def download_delta(game_name, base_url=API_BASE, max_delta=MAX_DELTA, timeout=5):
+    """Busca só os concursos posteriores ao último gravado.
+    Retorna None quando a base está vazia ou o atraso passa de `max_delta` (caller usa o histórico completo)."""
+    last = db_get_last_concurso(game_name)
+    if last is None: return None
+    with requests.Session() as s:
+        latest = fetch_result(game_name, session=s, base_url=base_url, timeout=timeout)
+        newest = int(latest['numero'])
+        if newest <= last: return True, f"Sem novidades (Conc {last})"
+        if newest - last > max_delta: return None
+        results = [fetch_result(game_name, c, session=s, base_url=base_url, timeout=timeout) for c in range(last + 1, newest)]
+    df_clean = results_to_dataframe(results + [latest], game_name)
+    save_draws(df_clean, game_name)
+    return True, f"Atualizado: {len(df_clean)}"
+
+def fetch_full_dump(game_name, url=None, timeout=15):
+    r = requests.get(url or BASE_CONFIG[game_name]['url_zip'], headers=HEADERS, verify=False, timeout=timeout)
+    r.raise_for_status()
+    content = r.text.replace('&nbsp;', '')
+    try:
+        j = r.json()
+        if 'html' in j: content = j['html']
+    except: pass
+    return content
+
+@timed(rows=lambda df, *a, **k: len(df))
+def parse_full_dump(content, game_name):
+    dfs = pd.read_html(io.StringIO(content), decimal=',', thousands='.')
+    return process_dataframe(dfs[0], game_name) if dfs else pd.DataFrame()
+
+def save_parsed(df_clean, game_name):
+    if df_clean.empty: return False, "Erro"
+    save_draws(df_clean, game_name)
+    return True, f"Atualizado: {len(df_clean)}"
+
+def download_full(game_name, url=None, timeout=15):
+    return save_parsed(parse_full_dump(fetch_full_dump(game_name, url, timeout), game_name), game_name)
+
+def download_update_data(game_name, incremental=True, base_url=API_BASE, full_url=None):
+    try:
+        if incremental:
+            try:
+                res = download_delta(game_name, base_url=base_url)
+                if res is not None: return res
+            except requests.RequestException: pass  # endpoint por concurso fora do ar: tenta o dump completo
+        return download_full(game_name, url=full_url)
+    except Exception as e: return False, str(e)
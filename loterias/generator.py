@@ -0,0 +1,147 @@
+from math import comb, prod
+
+import numpy as np
+
+from loterias.bitmask import encode_matrix, hit_counts
+from loterias.config import BASE_CONFIG
+from loterias.metrics import timed
+
+# --- Gerador em lote ---
+# Sorteia milhares de volantes por vez, aplica filtros vetorizados sobre a matriz ordenada de dezenas
+# e garante unicidade pela posição de cada combinação no sistema combinatório (um int64 por volante):
+# sorteia posições, descarta repetidas com np.unique e busca binária, e só então monta as dezenas.
+# Um filtro é qualquer função (dezenas[n, k], masks[n, palavras]) -> bool[n].
+
+BATCH = 65536
+MAX_CANDIDATES = 5_000_000  # desiste depois de tantos candidatos (filtros impossíveis)
+
+def even_odd(min_even=1, max_even=None):
+    def f(nums, masks):
+        ev = np.count_nonzero(nums % 2 == 0, axis=1)
+        return (ev >= min_even) & (ev <= (nums.shape[1] - 1 if max_even is None else max_even))
+    return f
+
+def sum_range(lo=None, hi=None):
+    def f(nums, masks):
+        s = nums.sum(axis=1, dtype=np.int32)
+        return (s >= (lo if lo is not None else 0)) & (s <= (hi if hi is not None else np.iinfo(np.int32).max))
+    return f
+
+def max_consecutive(limit):
+    def f(nums, masks):
+        run = np.ones(nums.shape[0], dtype=np.int16); best = run.copy()
+        for j in range(1, nums.shape[1]):
+            run = np.where(nums[:, j] - nums[:, j - 1] == 1, run + 1, 1)
+            np.maximum(best, run, out=best)
+        return best <= limit
+    return f
+
+def exclude_history(draw_masks, draw, max_hits=None):
+    """Descarta volantes que repetem (ou contêm) um resultado passado: acertos >= max_hits em algum sorteio."""
+    draw_masks = np.asarray(draw_masks, dtype=np.uint64)
+    max_hits = draw if max_hits is None else max_hits
+    past = set(_keys(draw_masks))
+    def f(nums, masks):
+        if nums.shape[1] == draw and max_hits == draw:
+            return np.fromiter((k not in past for k in _keys(masks)), dtype=bool, count=masks.shape[0])
+        return hit_counts(masks, draw_masks).max(axis=1, initial=0) < max_hits
+    return f
+
+def default_filters(game_name):
+    # Equivalente ao antigo check_filters: nem todos pares, nem todos ímpares.
+    return [even_odd(1, None)]
+
+def _keys(masks):
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if masks.shape[1] == 1: return masks[:, 0].tolist()
+    return masks.view(np.dtype((np.void, 8 * masks.shape[1]))).ravel().tolist()
+
+def binomial_table(n, k):
+    """table[i, j] = C(i, j) para i <= n, j <= k (int64), ou None se C(n, k) não cabe em int64."""
+    if comb(n, k) >= 2**63: return None
+    return np.array([[comb(i, j) for j in range(k + 1)] for i in range(n + 1)], dtype=np.int64)
+
+def unrank_colex(ranks, table, k):
+    """Posições no sistema combinatório -> índices ordenados (n, k) das combinações, k buscas binárias."""
+    out = np.empty((len(ranks), k), dtype=np.int16)
+    r = np.array(ranks, dtype=np.int64)
+    for j in range(k, 0, -1):
+        c = np.searchsorted(table[:, j], r, side='right') - 1  # maior c com C(c, j) <= r
+        out[:, j - 1] = c
+        r -= table[c, j]
+    return out
+
+def _sample(rng, pool, needed, n):
+    """n subconjuntos ordenados de `needed` elementos do pool, sem repetição dentro da linha."""
+    P = len(pool)
+    if needed == 0: return np.empty((n, 0), dtype=np.int16)
+    if prod(1 - i / P for i in range(needed)) >= 0.5:
+        # Poucos elementos de um pool grande: sorteio com reposição e descarte de linhas repetidas.
+        idx = rng.integers(0, P, (int(n * 1.5) + 16, needed), dtype=np.int16)
+        idx.sort(axis=1)
+        idx = idx[(np.diff(idx, axis=1) != 0).all(axis=1)][:n]
+    else:
+        idx = np.argpartition(rng.random((n, P), dtype=np.float32), needed - 1, axis=1)[:, :needed].astype(np.int16)
+        idx.sort(axis=1)
+    return pool[idx]
+
+def sample_subsets(rng, pool, k, n):
+    """Exatamente n subconjuntos ordenados de k elementos do pool (um por linha)."""
+    if n <= 0: return np.empty((0, k), dtype=pool.dtype)
+    parts, got = [], 0
+    while got < n:
+        part = _sample(rng, pool, k, n - got)
+        parts.append(part); got += len(part)
+    return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+def generate_games(game_name, qtd, num_dezenas, fixos=(), filters=None, seed=None, batch=BATCH,
+                   max_candidates=MAX_CANDIDATES):
+    """Até `qtd` volantes únicos e ordenados (matriz int16). Mesmo `seed` -> mesma saída.
+    Retorna menos linhas só quando os filtros esgotam `max_candidates`; o chamador deve checar."""
+    cfg = BASE_CONFIG[game_name]
+    fixos = sorted({int(x) for x in fixos})
+    pool = np.array([n for n in range(1, cfg['range'] + 1) if n not in fixos], dtype=np.int16)
+    needed = num_dezenas - len(fixos)
+    if needed < 0 or needed > len(pool): raise ValueError("Quantidade de fixos incompatível com o número de dezenas.")
+    qtd = min(qtd, comb(len(pool), needed))
+    filters = default_filters(game_name) if filters is None else filters
+    rng = np.random.default_rng(seed)
+    batch = min(batch, max(1024, 4 * qtd))
+    table = binomial_table(len(pool), needed)
+    seen, seen_set, out, total, sampled = np.empty(0, dtype=np.int64), set(), [], 0, 0
+    fixed = np.array(fixos, dtype=np.int16)
+    while total < qtd and sampled < max_candidates:
+        if table is not None:
+            # Sorteia posições de combinação: np.unique tira as repetidas do lote (1ª ocorrência, na ordem
+            # sorteada) e a busca binária no array ordenado das já vistas, as de lotes anteriores.
+            # Só as primeiras (com folga para os filtros) viram dezenas e entram nas vistas.
+            ranks = rng.integers(0, table[len(pool), needed], batch, dtype=np.int64)
+            u, first = np.unique(ranks, return_index=True)
+            pos = np.searchsorted(seen, u)
+            new = (pos == len(seen)) | (seen[np.minimum(pos, len(seen) - 1)] != u) if len(seen) else np.ones(len(u), dtype=bool)
+            take = np.sort(first[new])[:2 * (qtd - total) + 1024]
+            ranks = ranks[take]; added = np.sort(ranks)
+            seen = np.insert(seen, np.searchsorted(seen, added), added)
+            cand = pool[unrank_colex(ranks, table, needed)]
+        else: cand = _sample(rng, pool, needed, batch)
+        sampled += batch
+        if len(fixed):
+            cand = np.concatenate([cand, np.broadcast_to(fixed, (len(cand), len(fixed)))], axis=1)
+            cand.sort(axis=1)
+        masks = encode_matrix(cand, cfg['range'])
+        ok = np.ones(len(cand), dtype=bool)
+        for f in filters:
+            ok &= f(cand, masks)
+        cand, masks = cand[ok], masks[ok]
+        if table is None:
+            keep = np.fromiter((k not in seen_set and not seen_set.add(k) for k in _keys(masks)), dtype=bool, count=len(cand))
+            cand = cand[keep]
+        cand = cand[:qtd - total]
+        out.append(cand); total += len(cand)
+    return np.concatenate(out) if out else np.empty((0, num_dezenas), dtype=np.int16)
+
+@timed(rows=lambda res, *a, **k: len(res))
+def generate_smart_games(game_name, qtd, num_dezenas, fixos=[], filters=None, seed=None):
+    cfg = BASE_CONFIG[game_name]
+    if num_dezenas < cfg['draw']: num_dezenas = cfg['draw']
+    return generate_games(game_name, qtd, num_dezenas, fixos, filters, seed).tolist()
@@ -0,0 +1,125 @@
+import itertools
+import re
+import time
+import zipfile
+from datetime import date, datetime
+from typing import NamedTuple
+
+from loterias.cache import draw_cache
+from loterias.config import BASE_CONFIG
+from loterias.db import db_save_draw_records, pack_draws
+from loterias.etl import column_name, is_header_row
+from loterias.metrics import timed
+
+# --- Ingestão em streaming ---
+# Lê HTML/XLSX/ZIP linha a linha e grava em lotes: a memória fica limitada ao tamanho do lote,
+# não ao do arquivo. O cabeçalho é reconhecido pelas mesmas regras de process_dataframe.
+
+CHUNK_ROWS = 2000
+HEADER_SCAN_ROWS = 20
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%y')
+_NON_DIGIT = re.compile(r'[^\d]')
+
+class IngestReport(NamedTuple):
+    rows: int
+    skipped: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+def to_int(v):
+    if isinstance(v, (int, float)) and not isinstance(v, bool): return int(v) if v == v else 0
+    digits = _NON_DIGIT.sub('', str(v)) if v is not None else ''
+    return int(digits) if digits else 0
+
+def to_iso_date(v):
+    if isinstance(v, datetime): return v.strftime('%Y-%m-%d')
+    if isinstance(v, date): return v.isoformat()
+    if v is None: return None
+    txt = str(v).strip()
+    for fmt in DATE_FORMATS:
+        try: return datetime.strptime(txt, fmt).strftime('%Y-%m-%d')
+        except ValueError: pass
+    return None
+
+def header_index(header, game_name):
+    """Cabeçalho -> {'Concurso': i, 'Data': j, 'D1': k, ...}; posicional se faltarem dezenas."""
+    k = BASE_CONFIG[game_name]['draw']
+    cols_draw = [f'D{i}' for i in range(1, k + 1)]
+    idx = {}
+    for i, col in enumerate(header):
+        name = column_name(col if col is not None else '')
+        if name and name not in idx: idx[name] = i
+    if all(c in idx for c in cols_draw) and 'Concurso' in idx and 'Data' in idx: return idx
+    if len(header) >= k + 2: return {'Concurso': 0, 'Data': 1, **{c: 2 + j for j, c in enumerate(cols_draw)}}
+    return None
+
+def normalize_rows(rows, game_name):
+    """Linhas cruas (listas de células) -> tuplas (concurso, data ISO, dezenas) (None se inválida)."""
+    k = BASE_CONFIG[game_name]['draw']
+    rows, head, idx = iter(rows), [], None
+    for row in rows:
+        if is_header_row(['' if c is None else c for c in row]): idx = header_index(row, game_name); head = []; break
+        head.append(row)
+        if len(head) >= HEADER_SCAN_ROWS: break
+    if idx is None and head:  # sem cabeçalho reconhecível: a primeira linha faz o papel dele
+        idx, head = header_index(head[0], game_name), head[1:]
+    for row in itertools.chain(head, rows): yield _record(row, idx, game_name, k)
+
+def _record(row, idx, game_name, k):
+    if idx is None or len(row) <= max(idx.values()): return None
+    conc = to_int(row[idx['Concurso']])
+    if conc <= 0: return None
+    return conc, to_iso_date(row[idx['Data']]), [to_int(row[idx[f'D{i}']]) for i in range(1, k + 1)]
+
+# --- Leitores ---
+
+def iter_html_rows(fileobj):
+    from lxml import etree
+    depth = 0
+    for event, el in etree.iterparse(fileobj, events=('start', 'end'), html=True, recover=True):
+        if el.tag == 'table':
+            depth += 1 if event == 'start' else -1
+        elif event == 'end' and el.tag == 'tr' and depth == 1:
+            yield [' '.join(''.join(c.itertext()).split()) for c in el if c.tag in ('td', 'th')]
+            el.clear()
+            parent = el.getparent()
+            while parent is not None and el.getprevious() is not None: del parent[0]
+
+def iter_xlsx_rows(fileobj):
+    from openpyxl import load_workbook
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True): yield list(row)
+    finally: wb.close()
+
+def iter_file_rows(fileobj, filename):
+    name = filename.lower()
+    if name.endswith('.zip'):
+        with zipfile.ZipFile(fileobj) as z:
+            fn = [n for n in z.namelist() if n.lower().endswith(('.htm', '.html', '.xlsx'))][0]
+            with z.open(fn) as f: yield from iter_file_rows(f, fn)
+    elif name.endswith('.xlsx'): yield from iter_xlsx_rows(fileobj)
+    else: yield from iter_html_rows(fileobj)
+
+# --- Pipeline ---
+
+def ingest_rows(rows, game_name, chunk_rows=CHUNK_ROWS):
+    t0 = time.perf_counter()
+    n = skipped = 0
+    min_conc, chunk = None, []
+    for rec in normalize_rows(rows, game_name):
+        if rec is None: skipped += 1; continue
+        chunk.append(rec)
+        min_conc = rec[0] if min_conc is None else min(min_conc, rec[0])
+        if len(chunk) >= chunk_rows:
+            db_save_draw_records(pack_draws(game_name, *zip(*chunk))); n += len(chunk); chunk = []
+    if chunk: db_save_draw_records(pack_draws(game_name, *zip(*chunk))); n += len(chunk)
+    if n: draw_cache.after_save(game_name, [min_conc])
+    return IngestReport(n, skipped, time.perf_counter() - t0)
+
+@timed(rows=lambda rep, *a, **k: rep.rows)
+def ingest_file(fileobj, filename, game_name, chunk_rows=CHUNK_ROWS):
+    return ingest_rows(iter_file_rows(fileobj, filename), game_name, chunk_rows)
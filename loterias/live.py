@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from loterias.db import get_pool
+from loterias.etl import API_BASE, fetch_result
+
+# --- Resultado ao vivo (Home) ---
+# A página lê sempre da memória ou do SQLite e nunca espera a rede: quando o valor passa do TTL,
+# uma thread em segundo plano busca o último concurso e grava nos dois.
+# Falhas seguidas abrem o disjuntor: o endpoint fica sem novas tentativas até o fim do `cooldown`.
+
+TTL = 300.0
+TIMEOUT = 3
+FAIL_THRESHOLD = 3
+COOLDOWN = 120.0
+
+SQL_SAVE_LATEST = "INSERT OR REPLACE INTO latest_results (game, payload, fetched_at) VALUES (?,?,?)"
+SQL_LOAD_LATEST = "SELECT payload, fetched_at FROM latest_results WHERE game = ?"
+
+class CircuitBreaker:
+    def __init__(self, threshold=FAIL_THRESHOLD, cooldown=COOLDOWN, clock=time.monotonic):
+        self.threshold, self.cooldown, self.clock = threshold, cooldown, clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False  # meio-aberto: a única tentativa já foi liberada
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return 'fechado'
+        return 'aberto' if self.clock() - self.opened_at < self.cooldown else 'meio-aberto'
+
+    def allow(self):
+        # Meio-aberto deixa passar uma só tentativa (as chamadas concorrentes recebem False até ela
+        # terminar); se falhar, volta a abrir por mais um `cooldown`.
+        with self._lock:
+            state = self.state
+            if state == 'meio-aberto':
+                if self._probing: return False
+                self._probing = True
+            return state != 'aberto'
+
+    def success(self):
+        with self._lock: self.failures, self.opened_at, self._probing = 0, None, False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.threshold: self.opened_at = self.clock()
+
+class LiveResults:
+    def __init__(self, base_url=None, ttl=TTL, timeout=TIMEOUT, breaker=None, clock=time.time):
+        self.base_url = base_url or os.environ.get('LOTERIAS_API', API_BASE)
+        self.ttl, self.timeout, self.clock = ttl, timeout, clock
+        self.breaker = breaker or CircuitBreaker()
+        self._mem = {}  # game -> (json da API, buscado_em)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, game_name, wait=False):
+        """Último resultado conhecido (json da API, buscado_em) ou None. Se vencido, dispara a atualização
+        em segundo plano e devolve o que já tem (com `wait`, espera a busca terminar)."""
+        entry = self._mem.get(game_name) or self._load(game_name)
+        if entry is None or self.clock() - entry[1] > self.ttl:
+            t = self.refresh(game_name)
+            if wait and t is not None: t.join()
+        return self._mem.get(game_name) or entry
+
+    def refresh(self, game_name):
+        """Inicia a busca (uma por modalidade por vez). Retorna a thread, ou None se já em curso ou disjuntor aberto."""
+        with self._lock:
+            if game_name in self._inflight or not self.breaker.allow(): return None
+            t = self._inflight[game_name] = threading.Thread(target=self._fetch, args=(game_name,), daemon=True)
+        t.start()
+        return t
+
+    def fetching(self, game_name):
+        return game_name in self._inflight
+
+    def _fetch(self, game_name):
+        try:
+            js = fetch_result(game_name, base_url=self.base_url, timeout=self.timeout)
+            int(js['numero']); [int(d) for d in js['listaDezenas']]  # formato inesperado conta como falha
+        except (requests.RequestException, ValueError, KeyError, TypeError):
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+            self._store(game_name, js, self.clock())
+        finally:
+            with self._lock: self._inflight.pop(game_name, None)
+
+    def _store(self, game_name, js, fetched_at):
+        self._mem[game_name] = (js, fetched_at)
+        try:
+            with get_pool().write() as conn: conn.execute(SQL_SAVE_LATEST, (game_name, json.dumps(js), fetched_at))
+        except sqlite3.Error: pass  # segue só em memória
+
+    def _load(self, game_name):
+        try:
+            with get_pool().read() as conn: row = conn.execute(SQL_LOAD_LATEST, (game_name,)).fetchone()
+        except sqlite3.Error: return None
+        if row is None: return None
+        entry = self._mem[game_name] = (json.loads(row[0]), row[1])
+        return entry
+
+live_results = LiveResults()
@@ -0,0 +1,147 @@
+import functools
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# --- Métricas dos caminhos quentes ---
+# Contagem de chamadas, latência (p50/p95 sobre as últimas SAMPLES medições) e linhas processadas.
+# Desligado (LOTERIAS_METRICS=0 ou registry.enabled = False), o custo é um teste de atributo por chamada.
+
+SAMPLES = 1024
+
+class Metric:
+    __slots__ = ('count', 'total', 'rows', 'errors', 'samples')
+
+    def __init__(self):
+        self.count = self.rows = self.errors = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+class Registry:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, name, seconds, rows=0, error=False):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None: m = self._metrics[name] = Metric()
+            m.count += 1; m.total += seconds; m.rows += rows; m.errors += error
+            m.samples.append(seconds)
+
+    def reset(self):
+        with self._lock: self._metrics.clear()
+        self.started = time.time()
+
+    def snapshot(self):
+        """{nome: {count, errors, rows, total_s, mean_ms, p50_ms, p95_ms}} ordenado pelo tempo total."""
+        with self._lock: items = [(k, m.count, m.errors, m.rows, m.total, list(m.samples)) for k, m in self._metrics.items()]
+        out = {}
+        for name, count, errors, rows, total, samples in sorted(items, key=lambda x: -x[4]):
+            p50, p95 = np.percentile(samples, [50, 95]) * 1000 if samples else (0.0, 0.0)
+            out[name] = {"count": count, "errors": errors, "rows": rows, "total_s": round(total, 6),
+                         "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                         "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3)}
+        return out
+
+    def to_json(self):
+        return json.dumps({"since": self.started, "metrics": self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix="loterias"):
+        snap = self.snapshot()
+        lines = []
+        for metric, key, kind, scale in (("calls_total", "count", "counter", 1), ("errors_total", "errors", "counter", 1),
+                                         ("rows_total", "rows", "counter", 1), ("seconds_total", "total_s", "counter", 1),
+                                         ("latency_seconds", None, "summary", 1e-3)):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, m in snap.items():
+                if key: lines.append(f'{prefix}_{metric}{{op="{name}"}} {m[key]}')
+                else:
+                    lines.append(f'{prefix}_{metric}{{op="{name}",quantile="0.5"}} {m["p50_ms"] * scale:.6f}')
+                    lines.append(f'{prefix}_{metric}{{op="{name}",quantile="0.95"}} {m["p95_ms"] * scale:.6f}')
+        return "\n".join(lines) + "\n"
+
+registry = Registry(enabled=os.environ.get('LOTERIAS_METRICS', '1') != '0')
+
+def timed(name=None, rows=None):
+    """Decorador. `rows(resultado, *args, **kwargs)` diz quantas linhas a chamada processou."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled: return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try: res = fn(*args, **kwargs)
+            except Exception:
+                registry.record(label, time.perf_counter() - t0, error=True); raise
+            n = 0
+            if rows is not None:
+                try: n = int(rows(res, *args, **kwargs))
+                except Exception: pass
+            registry.record(label, time.perf_counter() - t0, n)
+            return res
+        return wrapper
+    return deco
+
+class _Span:
+    __slots__ = ('rows',)
+
+    def __init__(self): self.rows = 0
+
+@contextmanager
+def timer(name):
+    """Bloco medido; atribua `span.rows` dentro dele para contar linhas."""
+    span = _Span()
+    if not registry.enabled:
+        yield span; return
+    t0 = time.perf_counter(); error = False
+    try: yield span
+    except Exception:
+        error = True; raise
+    finally: registry.record(name, time.perf_counter() - t0, span.rows, error)
+
+# --- Perfil de uma execução ---
+# pyinstrument/cProfile só são importados quando um perfil é pedido, não ao carregar o módulo.
+
+class RerunProfile:
+    """Perfil de um trecho: pyinstrument se instalado, senão cProfile. `report` fica com o texto."""
+    def __init__(self, engine=None, top=40):
+        self.engine, self.top, self.report = engine, top, ""
+
+    def start(self):
+        if self.engine in (None, 'pyinstrument'):
+            try:
+                from pyinstrument import Profiler
+                self.engine, self._p = 'pyinstrument', Profiler()
+            except ImportError:
+                if self.engine: raise
+                self.engine = 'cProfile'
+        if self.engine == 'pyinstrument': self._p.start()
+        else:
+            import cProfile
+            self._p = cProfile.Profile(); self._p.enable()
+        return self
+
+    def stop(self):
+        if self.engine == 'pyinstrument':
+            self._p.stop(); self.report = self._p.output_text(unicode=True)
+        else:
+            import pstats
+            self._p.disable()
+            buf = io.StringIO()
+            pstats.Stats(self._p, stream=buf).sort_stats('cumulative').print_stats(self.top)
+            self.report = buf.getvalue()
+        return self.report
+
+    def __enter__(self): return self.start()
+
+    def __exit__(self, *exc):
+        self.stop(); return False
@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import ceil, sqrt
+
+import numpy as np
+
+from loterias.bitmask import encode_matrix, encode_tickets, hit_counts
+from loterias.config import BASE_CONFIG
+from loterias.generator import sample_subsets
+from loterias.parallel import default_workers, mp_context
+
+# --- Simulação Monte Carlo ---
+# Sorteia concursos sintéticos uniformes e confere a carteira inteira em cada um (bitmask + popcount).
+# O trabalho é dividido em lotes com sementes independentes (SeedSequence.spawn), espalhados por processos;
+# os resultados parciais são somados e entregues à medida que os lotes terminam.
+
+CHUNK_CONTESTS = 200_000
+CELLS = 8_000_000  # volantes x concursos por bloco dentro do worker
+Z95 = 1.959963984540054
+
+def prize_table(game_name):
+    cfg = BASE_CONFIG[game_name]
+    lut = np.zeros(cfg['draw'] + 1, dtype=np.float64)
+    for k, v in cfg['est_prize'].items(): lut[k] = v
+    return lut
+
+def simulate_chunk(game_name, ticket_masks, n_contests, seed):
+    """Um lote: retorna contagens por faixa e a distribuição (valor -> concursos) do retorno da carteira."""
+    cfg = BASE_CONFIG[game_name]
+    rng = np.random.default_rng(seed)
+    pool = np.arange(1, cfg['range'] + 1, dtype=np.int16)
+    tiers = sorted(cfg['est_prize'])
+    lut = prize_table(game_name)
+    tier_tickets = np.zeros(len(tiers), dtype=np.int64); tier_any = np.zeros(len(tiers), dtype=np.int64)
+    values, counts = [], []
+    step = max(1, CELLS // max(1, len(ticket_masks)))
+    done = 0
+    while done < n_contests:
+        m = min(step, n_contests - done)
+        draws = encode_matrix(sample_subsets(rng, pool, cfg['draw'], m), cfg['range'])
+        hits = hit_counts(ticket_masks, draws)
+        for j, k in enumerate(tiers):
+            hk = hits == k
+            tier_tickets[j] += np.count_nonzero(hk); tier_any[j] += np.count_nonzero(hk.any(axis=0))
+        v, c = np.unique(lut[hits].sum(axis=0), return_counts=True)
+        values.append(v); counts.append(c)
+        done += m
+    v, inv = np.unique(np.concatenate(values), return_inverse=True)
+    return {"n": n_contests, "tier_tickets": tier_tickets, "tier_any": tier_any,
+            "values": v, "counts": np.bincount(inv, weights=np.concatenate(counts)).astype(np.int64)}
+
+def wilson(k, n, z=Z95):
+    if n == 0: return 0.0, 0.0
+    p = k / n; den = 1 + z * z / n
+    mid = (p + z * z / (2 * n)) / den
+    half = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+class MonteCarloResult:
+    def __init__(self, game_name, n_tickets, cost, target):
+        self.game_name, self.n_tickets, self.cost, self.target = game_name, n_tickets, cost, target
+        self.tiers = sorted(BASE_CONFIG[game_name]['est_prize'])
+        self.n = 0
+        self.tier_tickets = np.zeros(len(self.tiers), dtype=np.int64)
+        self.tier_any = np.zeros(len(self.tiers), dtype=np.int64)
+        self.returns = {}
+
+    def add(self, part):
+        self.n += part['n']
+        self.tier_tickets += part['tier_tickets']; self.tier_any += part['tier_any']
+        for v, c in zip(part['values'].tolist(), part['counts'].tolist()): self.returns[v] = self.returns.get(v, 0) + c
+
+    @property
+    def progress(self):
+        return self.n / self.target if self.target else 1.0
+
+    def _moments(self):
+        v = np.fromiter(self.returns.keys(), dtype=np.float64); c = np.fromiter(self.returns.values(), dtype=np.float64)
+        mean = float((v * c).sum() / self.n) if self.n else 0.0
+        var = float((c * (v - mean) ** 2).sum() / max(1, self.n - 1)) if self.n else 0.0
+        return mean, var
+
+    def summary(self):
+        """Retorno por concurso (média, IC 95%), prejuízo esperado, chance de lucro e quantis."""
+        mean, var = self._moments()
+        half = Z95 * sqrt(var / self.n) if self.n else 0.0
+        profit = sum(c for v, c in self.returns.items() if v > self.cost)
+        v = np.array(sorted(self.returns)); cum = np.cumsum([self.returns[x] for x in v]) if len(v) else np.array([])
+        q = {p: float(v[np.searchsorted(cum, p * self.n, 'left')]) if self.n else 0.0 for p in (0.5, 0.99, 0.999)}
+        return {"concursos": self.n, "custo": self.cost, "retorno_medio": mean, "ic95": (mean - half, mean + half),
+                "saldo_medio": mean - self.cost, "roi": (mean - self.cost) / self.cost if self.cost else 0.0,
+                "p_lucro": profit / self.n if self.n else 0.0, "p_lucro_ic95": wilson(profit, self.n),
+                "quantis": q}
+
+    def tier_table(self):
+        labels = BASE_CONFIG[self.game_name]['labels']
+        rows, n_cells = [], self.n * self.n_tickets
+        for j, k in enumerate(self.tiers):
+            lo, hi = wilson(int(self.tier_any[j]), self.n)
+            rows.append({"Faixa": labels.get(k, f"{k} pts"), "Prob. por volante": float(self.tier_tickets[j] / n_cells) if n_cells else 0.0,
+                         "Prob. carteira (concurso)": float(self.tier_any[j] / self.n) if self.n else 0.0,
+                         "IC95 mín": lo, "IC95 máx": hi, "Ocorrências": int(self.tier_tickets[j])})
+        return rows
+
+def run_simulation(game_name, tickets, costs, n_contests, workers=None, seed=None, chunk=CHUNK_CONTESTS):
+    """Gerador: após cada lote concluído, rende o MonteCarloResult acumulado."""
+    cfg = BASE_CONFIG[game_name]
+    masks = encode_tickets(tickets, cfg['range'])
+    workers = workers or default_workers()
+    n_chunks = max(1, ceil(n_contests / chunk))
+    sizes = [n_contests // n_chunks + (i < n_contests % n_chunks) for i in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    res = MonteCarloResult(game_name, len(tickets), float(sum(costs)), n_contests)
+    if workers == 1:
+        for size, ss in zip(sizes, seeds):
+            res.add(simulate_chunk(game_name, masks, size, ss)); yield res
+        return
+    with ProcessPoolExecutor(workers, mp_context=mp_context()) as ex:
+        futures = [ex.submit(simulate_chunk, game_name, masks, size, ss) for size, ss in zip(sizes, seeds)]
+        for f in as_completed(futures):
+            res.add(f.result()); yield res
@@ -0,0 +1,18 @@
+import multiprocessing
+import os
+
+# --- Processos ---
+# forkserver com os módulos de trabalho pré-carregados: cada worker nasce por fork de um processo
+# que já importou pandas/numpy, em vez de reimportar tudo (spawn) ou herdar as threads do Streamlit (fork).
+
+PRELOAD = ['loterias.etl', 'loterias.montecarlo', 'loterias.scoring']  # só os módulos dos workers, nunca um __main__ de CLI
+
+def mp_context():
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(PRELOAD)
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
@@ -0,0 +1,96 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from loterias.metrics import timed
+from loterias.stats import one_hot
+
+# --- Pares, trios, atrasos e sequências por janela ---
+# Pares: produto da matriz one-hot (via StatsIndex.pair_counts).
+# Trios: cada sorteio vira C(k,3) códigos uint32 a*R² + b*R + c (a<b<c); a janela é um bincount.
+# Atrasos/sequências: posições de cada dezena na janela, tudo com operações vetorizadas.
+
+def triple_codes(numbers, num_range):
+    """Matriz (sorteios, C(k,3)) uint32 com o código de cada trio do sorteio."""
+    nums = np.sort(numbers.astype(np.uint32), axis=1)
+    cols = np.array(list(itertools.combinations(range(nums.shape[1]), 3)), dtype=np.intp).reshape(-1, 3)
+    R = np.uint32(num_range + 1)
+    return nums[:, cols[:, 0]] * R * R + nums[:, cols[:, 1]] * R + nums[:, cols[:, 2]]
+
+def _codes(idx):
+    # Calculado uma vez por índice (muda junto com a base).
+    if getattr(idx, '_triple_codes', None) is None: idx._triple_codes = triple_codes(idx.numbers, idx.num_range)
+    return idx._triple_codes
+
+@timed(rows=lambda res, idx, lo, hi, *a, **k: hi - lo)
+def top_pairs(idx, lo, hi, top=20):
+    pc = np.triu(idx.pair_counts(lo, hi))
+    flat = pc.ravel()
+    top = min(top, np.count_nonzero(flat))
+    if top == 0: return pd.DataFrame(columns=["Par", "Vezes"])
+    sel = np.argpartition(flat, -top)[-top:]
+    sel = sel[np.lexsort((sel, -flat[sel]))]
+    a, b = np.divmod(sel, pc.shape[1])
+    return pd.DataFrame({"Par": [f"{x:02d}-{y:02d}" for x, y in zip(a, b)], "Vezes": flat[sel]})
+
+def triple_counts(idx, lo, hi):
+    """Trios presentes na janela como arrays compactos (códigos uint32, contagens uint32)."""
+    R = idx.num_range + 1
+    counts = np.bincount(_codes(idx)[lo:hi].ravel(), minlength=R ** 3)
+    codes = np.flatnonzero(counts).astype(np.uint32)
+    return codes, counts[codes].astype(np.uint32)
+
+@timed(rows=lambda res, idx, lo, hi, *a, **k: hi - lo)
+def top_triples(idx, lo, hi, top=20):
+    codes, counts = triple_counts(idx, lo, hi)
+    top = min(top, len(codes))
+    if top == 0: return pd.DataFrame(columns=["Trio", "Vezes"])
+    sel = np.argpartition(counts, -top)[-top:]
+    sel = sel[np.lexsort((codes[sel], -counts[sel].astype(np.int64)))]
+    R = idx.num_range + 1
+    a, rem = np.divmod(codes[sel], R * R); b, c = np.divmod(rem, R)
+    return pd.DataFrame({"Trio": [f"{x:02d}-{y:02d}-{z:02d}" for x, y, z in zip(a, b, c)], "Vezes": counts[sel]})
+
+def _appearances(idx, lo, hi):
+    """(dezena, posição relativa) de cada aparição na janela, ordenado por dezena e posição."""
+    oh = one_hot(idx.numbers[lo:hi], idx.num_range)
+    num, pos = np.nonzero(oh.T)
+    return num, pos
+
+@timed(rows=lambda res, idx, lo, hi, *a, **k: hi - lo)
+def gap_stats(idx, lo, hi):
+    """Por dezena: frequência, atraso atual, ausência média e máxima, maior sequência e sequência atual."""
+    R, n = idx.num_range, hi - lo
+    num, pos = _appearances(idx, lo, hi)
+    freq = np.bincount(num, minlength=R + 1)
+    first = np.full(R + 1, n); last = np.full(R + 1, -1)
+    np.minimum.at(first, num, pos); np.maximum.at(last, num, pos)
+    same = np.r_[False, num[1:] == num[:-1]]
+    gaps = np.r_[0, np.diff(pos)] - 1  # sorteios de ausência entre aparições consecutivas
+    max_gap = np.maximum(first, np.where(last >= 0, n - 1 - last, n))  # ausência inicial e final
+    np.maximum.at(max_gap, num[same], gaps[same])
+    gap_sum = np.bincount(num[same], weights=gaps[same], minlength=R + 1)
+    n_gaps = np.bincount(num[same], minlength=R + 1)
+    # Sequências quentes: aparições em sorteios consecutivos.
+    run_id = np.cumsum(~(same & (gaps == 0)))
+    run_len = np.bincount(run_id)[run_id] if len(run_id) else run_id
+    hot = np.zeros(R + 1, dtype=np.int64); np.maximum.at(hot, num, run_len)
+    delay = np.where(last >= 0, n - 1 - last, n)
+    ends_now = np.zeros(R + 1, dtype=np.int64)
+    tail = (pos == n - 1)
+    ends_now[num[tail]] = run_len[tail]
+    current = np.where(ends_now > 0, ends_now, -delay)  # >0: saindo há N seguidos; <0: ausente há N
+    with np.errstate(invalid='ignore', divide='ignore'): mean_gap = gap_sum / n_gaps
+    return pd.DataFrame({"Dezena": np.arange(1, R + 1), "Freq": freq[1:], "Atraso": delay[1:],
+                         "Ausência média": np.round(mean_gap[1:], 1), "Maior ausência": max_gap[1:],
+                         "Maior sequência": hot[1:], "Sequência atual": current[1:]})
+
+@timed(rows=lambda res, idx, lo, hi, *a, **k: hi - lo)
+def gap_distribution(idx, lo, hi):
+    """Histograma das ausências (em sorteios) entre aparições consecutivas de todas as dezenas."""
+    num, pos = _appearances(idx, lo, hi)
+    same = np.r_[False, num[1:] == num[:-1]]
+    gaps = (np.r_[0, np.diff(pos)] - 1)[same]
+    counts = np.bincount(gaps) if len(gaps) else np.zeros(1, dtype=np.int64)
+    return pd.DataFrame({"Ausência": np.arange(len(counts)), "Ocorrências": counts})
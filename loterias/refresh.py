@@ -0,0 +1,109 @@
+"""Atualiza todas as modalidades em paralelo.
+
+Uso: python -m loterias.refresh [--games megasena quina] [--full] [--no-processes]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import requests
+
+from loterias.config import BASE_CONFIG
+from loterias.etl import API_BASE, download_delta, fetch_full_dump, parse_full_dump, save_parsed
+from loterias.parallel import mp_context
+
+# --- Atualização paralela ---
+# Rede em threads (uma por modalidade), parsing do histórico completo em processos separados
+# (read_html + process_dataframe seguram o GIL). A gravação fica no processo principal.
+
+RETRIES = 2
+BACKOFF = 1.0
+
+class RefreshReport(NamedTuple):
+    game: str
+    ok: bool
+    msg: str
+    attempts: int
+    fetch_s: float
+    parse_s: float
+    total_s: float
+
+def with_retries(fn, retries=RETRIES, backoff=BACKOFF):
+    """Executa fn() repetindo em erro de rede com espera exponencial. Retorna (resultado, tentativas)."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try: return fn(), attempt
+        except requests.RequestException:
+            if attempt > retries: raise
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+def refresh_game(game_name, incremental=True, parse_pool=None, retries=RETRIES, backoff=BACKOFF,
+                 base_url=API_BASE, full_url=None):
+    t0 = time.perf_counter()
+    attempts = 0
+    if incremental:
+        try: res, attempts = with_retries(lambda: download_delta(game_name, base_url=base_url), retries, backoff)
+        except requests.RequestException: res = None
+        if res is not None:
+            dt = time.perf_counter() - t0
+            return RefreshReport(game_name, res[0], res[1], attempts, dt, 0.0, dt)
+    content, n = with_retries(lambda: fetch_full_dump(game_name, full_url), retries, backoff)
+    t1 = time.perf_counter()
+    if parse_pool: df_clean = parse_pool.submit(parse_full_dump, content, game_name).result()
+    else: df_clean = parse_full_dump(content, game_name)
+    t2 = time.perf_counter()
+    ok, msg = save_parsed(df_clean, game_name)
+    return RefreshReport(game_name, ok, msg, attempts + n, t1 - t0, t2 - t1, time.perf_counter() - t0)
+
+def _safe_refresh(game_name, **kw):
+    t0 = time.perf_counter()
+    try: return refresh_game(game_name, **kw)
+    except Exception as e:
+        dt = time.perf_counter() - t0
+        return RefreshReport(game_name, False, str(e), 0, dt, 0.0, dt)
+
+def refresh_all(games=None, incremental=True, processes=True, retries=RETRIES, backoff=BACKOFF,
+                base_url=API_BASE, full_urls=None):
+    """Atualiza as modalidades ao mesmo tempo. Retorna (relatórios na ordem de `games`, tempo total)."""
+    games = list(games or BASE_CONFIG)
+    full_urls = full_urls or {}
+    t0 = time.perf_counter()
+    procs = ProcessPoolExecutor(len(games), mp_context=mp_context()) if processes else nullcontext()
+    with ThreadPoolExecutor(len(games)) as threads, procs as parse_pool:
+        futures = [threads.submit(_safe_refresh, g, incremental=incremental, parse_pool=parse_pool, retries=retries,
+                                  backoff=backoff, base_url=base_url, full_url=full_urls.get(g)) for g in games]
+        reports = [f.result() for f in futures]
+    return reports, time.perf_counter() - t0
+
+def format_report(reports, total_s):
+    lines = [f"{'modalidade':<11} {'ok':<3} {'tent.':>5} {'rede':>7} {'parse':>7} {'total':>7}  mensagem"]
+    for r in reports:
+        lines.append(f"{r.game:<11} {'sim' if r.ok else 'não':<3} {r.attempts:>5} {r.fetch_s:>6.2f}s {r.parse_s:>6.2f}s {r.total_s:>6.2f}s  {r.msg}")
+    lines.append(f"total: {total_s:.2f}s (soma sequencial seria {sum(r.total_s for r in reports):.2f}s)")
+    return "\n".join(lines)
+
+def main(argv=None):
+    by_slug = {cfg['slug']: g for g, cfg in BASE_CONFIG.items()}
+    ap = argparse.ArgumentParser(prog="python -m loterias.refresh", description="Atualiza os sorteios de todas as modalidades.")
+    ap.add_argument('--games', nargs='+', choices=sorted(by_slug), help="padrão: todas")
+    ap.add_argument('--full', action='store_true', help="baixa o histórico completo em vez do delta")
+    ap.add_argument('--no-processes', action='store_true', help="faz o parsing nas threads, sem processos")
+    ap.add_argument('--retries', type=int, default=RETRIES)
+    ap.add_argument('--api-base', default=API_BASE, help="endpoint de resultados por concurso")
+    ap.add_argument('--db', help="caminho do banco (padrão: LOTERIAS_DB ou loterias.db)")
+    args = ap.parse_args(argv)
+    if args.db: os.environ['LOTERIAS_DB'] = args.db
+    from loterias.db import init_db
+    init_db()
+    games = [by_slug[s] for s in args.games] if args.games else None
+    reports, total_s = refresh_all(games, incremental=not args.full, processes=not args.no_processes,
+                                    retries=args.retries, base_url=args.api_base)
+    print(format_report(reports, total_s))
+    return 0 if all(r.ok for r in reports) else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
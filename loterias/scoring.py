@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from loterias.bitmask import CHUNK_CELLS, encode_matrix, encode_tickets, hit_counts
+from loterias.config import BASE_CONFIG, draw_columns
+from loterias.metrics import timed
+
+# --- Conferência vetorizada (ROI, backtest e acertos por volante) ---
+
+def draw_numbers(df, game_name):
+    return df[draw_columns(game_name)].to_numpy(dtype=np.int64)
+
+def draw_masks(df, game_name):
+    return encode_matrix(draw_numbers(df, game_name), BASE_CONFIG[game_name]['range'])
+
+def payout_matrix(df, game_name, prizes):
+    """Matriz (sorteios de df, acertos) com o rateio pago em cada concurso (prizes = db_get_prizes).
+    Sem rateio gravado, ou faixa sem ganhador (valor real desconhecido), fica o est_prize."""
+    cfg = BASE_CONFIG[game_name]
+    lut = np.zeros(cfg['draw'] + 1)
+    for k, v in cfg['est_prize'].items(): lut[k] = v
+    pm = np.tile(lut, (len(df), 1))
+    conc, hits, winners, payout = prizes
+    if len(conc) and len(df):
+        row = pd.Index(df['Concurso'].to_numpy(dtype=np.int64)).get_indexer(conc.astype(np.int64))
+        ok = (row >= 0) & (payout > 0) & (hits <= cfg['draw']) & (lut[np.minimum(hits, cfg['draw'])] > 0)
+        pm[row[ok], hits[ok]] = payout[ok]
+    return pm
+
+def game_dates(user_games):
+    # Datas gravadas pelo app são ISO: converte tudo de uma vez; formatos avulsos caem no caminho lento.
+    dates = [g['date'] for g in user_games]
+    try: return pd.DatetimeIndex(pd.to_datetime(dates, format='%Y-%m-%d'))
+    except (ValueError, TypeError): return pd.DatetimeIndex([pd.to_datetime(d) for d in dates])
+
+@timed(rows=lambda res, df, games, *a, **k: len(df) * len(games))
+def calculate_roi(df_history, user_games, game_name, payouts=None):
+    """Investido, retorno e prêmios por faixa. Com `payouts` (payout_matrix), usa o rateio real de cada concurso."""
+    cfg = BASE_CONFIG[game_name]
+    total_spent = sum(g['cost'] for g in user_games)
+    total_won = 0
+    wins_count = {k:0 for k in cfg['labels'].keys()}
+    # Histórico vazio também quando o filtro por data (db_get_draws(since=...)) não deixou sorteios: o investido vale.
+    if df_history.empty or not user_games: return total_spent, total_won, wins_count
+    masks, dmasks = encode_tickets([g['nums'] for g in user_games], cfg['range']), draw_masks(df_history, game_name)
+    draw_dt = df_history['Data'].to_numpy(dtype='datetime64[ns]')
+    game_dt = game_dates(user_games).to_numpy(dtype='datetime64[ns]')
+    # Blocos de volantes: a matriz (volantes, sorteios) inteira não cabe na memória com carteiras grandes.
+    counts = np.zeros(cfg['draw'] + 1, dtype=np.int64)
+    paid = 0.0
+    step = max(1, CHUNK_CELLS // len(dmasks))
+    for s in range(0, len(masks), step):
+        hits = hit_counts(masks[s:s + step], dmasks)
+        valid = draw_dt[None, :] >= game_dt[s:s + step, None]
+        counts += np.bincount(hits[valid], minlength=cfg['draw'] + 1)[:cfg['draw'] + 1]
+        if payouts is not None: paid += float(payouts[np.arange(len(dmasks))[None, :], hits][valid].sum())
+    for k, prize in cfg['est_prize'].items():
+        n = int(counts[k])
+        if n:
+            total_won += prize * n; wins_count[k] += n
+    if payouts is not None: total_won = paid
+    return total_spent, total_won, wins_count
+
+@timed(rows=lambda res, df, *a, **k: len(df))
+def run_backtest(df, numbers, game_name, payouts=None):
+    cfg = BASE_CONFIG[game_name]
+    hist, won = [], 0
+    if df.empty: return hist, won
+    hits = hit_counts(encode_tickets([numbers], cfg['range']), draw_masks(df, game_name))[0]
+    conc, dates = df['Concurso'].to_numpy(), df['Data'].tolist()
+    for idx in np.flatnonzero(hits >= cfg['min_win']):
+        h = int(hits[idx]); prize = float(payouts[idx, h]) if payouts is not None else cfg['est_prize'].get(h, 0); won += prize
+        hist.append({"Concurso": conc[idx], "Data": dates[idx], "Acertos": h, "Prêmio": prize})
+    return hist, won
+
+@timed(rows=lambda res, df, *a, **k: len(df))
+def calculate_hits(df, game_nums, start_date, game_name, min_hits=1):
+    """Sorteios desde `start_date` com ao menos `min_hits` acertos (cfg['min_win'] = só faixas premiadas)."""
+    cfg = BASE_CONFIG[game_name]
+    if df.empty: return []
+    try: start_dt = pd.to_datetime(start_date)
+    except: start_dt = df['Data'].min()
+    valid = df[df['Data'] >= start_dt]
+    if valid.empty: return []
+    nums = draw_numbers(valid, game_name)
+    counts = hit_counts(encode_tickets([game_nums], cfg['range']), encode_matrix(nums, cfg['range']))[0]
+    game_set = set(game_nums)
+    conc, dates = valid['Concurso'].to_numpy(), valid['Data'].tolist()
+    hits = []
+    for idx in np.flatnonzero(counts >= max(1, min_hits)):
+        drawn = sorted({int(x) for x in nums[idx]})
+        hits.append({"Concurso": conc[idx], "Data": dates[idx].strftime('%d/%m/%Y'), "Acertos": int(counts[idx]), "Dezenas Sorteadas": drawn, "Seus Acertos": [x for x in drawn if x in game_set]})
+    hits.sort(key=lambda x: x['Acertos'], reverse=True)
+    return hits
+
+@timed(rows=lambda res, ds, games, *a, **k: len(games))
+def check_wallet(ds, user_games, ticket_masks, game_name, last_n=10, since_created=True):
+    """Confere todos os volantes contra os últimos `last_n` sorteios (DrawSet) numa só passada.
+    Retorna (linhas premiadas, resumo por volante)."""
+    cfg = BASE_CONFIG[game_name]
+    lo = max(0, len(ds.concurso) - int(last_n))
+    conc, dates = ds.concurso[lo:][::-1], ds.date[lo:][::-1]  # mais recente primeiro
+    if not user_games or not len(conc): return [], []
+    hits = hit_counts(ticket_masks, encode_matrix(ds.numbers[lo:][::-1], cfg['range']))
+    if since_created:
+        game_dt = pd.to_datetime(pd.Series([g['date'] for g in user_games]), errors='coerce').to_numpy(dtype='datetime64[D]')
+        hits[dates[None, :] < game_dt[:, None]] = 0  # NaT compara como falso: sem data, confere tudo
+    prizes = np.zeros(cfg['draw'] + 1); prizes[list(cfg['est_prize'])] = list(cfg['est_prize'].values())
+    won = hits >= cfg['min_win']
+    rows = []
+    for d, t in zip(*np.nonzero(won.T)):  # concurso mais recente primeiro
+        g, h = user_games[t], int(hits[t, d])
+        rows.append({"Jogo": g['nome'], "Concurso": int(conc[d]), "Data": pd.Timestamp(dates[d]).strftime('%d/%m/%Y'),
+                     "Acertos": h, "Faixa": cfg['labels'].get(h, f"{h} pts"), "Prêmio": float(prizes[h])})
+    best = hits.max(axis=1)
+    summary = [{"Jogo": g['nome'], "Melhor": int(b), "Premiados": int(w), "Prêmio": float(p)}
+               for g, b, w, p in zip(user_games, best, won.sum(axis=1), np.where(won, prizes[hits], 0).sum(axis=1))]
+    return rows, summary
+
+def score_chunk(game_name, ticket_masks, dmasks, payouts):
+    """Conferência em lote (executa nos workers). Por volante: melhor acerto, ocorrências por faixa premiada e prêmio total."""
+    cfg = BASE_CONFIG[game_name]
+    tiers = np.array(sorted(cfg['est_prize']))
+    hits = hit_counts(ticket_masks, dmasks)
+    per_tier = np.stack([np.count_nonzero(hits == k, axis=1) for k in tiers], axis=1)
+    won = hits >= cfg['min_win']
+    prize = np.where(won, payouts[np.arange(len(dmasks))[None, :], hits], 0.0).sum(axis=1)
+    best = hits.max(axis=1) if hits.shape[1] else np.zeros(len(ticket_masks), dtype=np.uint8)
+    return best, per_tier, prize
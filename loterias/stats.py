@@ -0,0 +1,128 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from loterias.cache import draw_cache
+from loterias.config import BASE_CONFIG
+from loterias.db import db_path
+from loterias.metrics import timed
+
+# --- Índice de estatísticas por dezena ---
+# Montado uma vez por atualização da base e salvo ao lado do SQLite (<banco>.<slug>.stats.npz).
+# Qualquer janela [Início, Fim] de concursos vira diferença de duas linhas de somas prefixadas.
+#   freq_prefix[i, n] = aparições da dezena n nos i primeiros sorteios
+#   last_pos[i, n]    = posição do último sorteio <= i com a dezena n (-1 se nunca saiu)
+#   pair_blocks[b]    = coocorrência de pares nos b*BLOCK primeiros sorteios (checkpoints)
+
+BLOCK = 64
+FORMAT_VERSION = 1
+
+def fingerprint(ds):
+    return np.array([FORMAT_VERSION, len(ds.concurso), ds.last or 0, zlib.crc32(ds.numbers.tobytes()),
+                     zlib.crc32(ds.concurso.tobytes())], dtype=np.int64)
+
+def one_hot(numbers, num_range):
+    oh = np.zeros((numbers.shape[0], num_range + 1), dtype=np.int8)
+    oh[np.arange(numbers.shape[0])[:, None], numbers.astype(np.int64)] = 1
+    oh[:, 0] = 0  # colunas vazias (dezena 0)
+    return oh
+
+class StatsIndex:
+    def __init__(self, concurso, numbers, num_range, freq_prefix, last_pos, pair_blocks, fp):
+        self.concurso, self.numbers, self.num_range = concurso, numbers, num_range
+        self.freq_prefix, self.last_pos, self.pair_blocks, self.fingerprint = freq_prefix, last_pos, pair_blocks, fp
+
+    @classmethod
+    def build(cls, ds, num_range):
+        oh = one_hot(ds.numbers, num_range)
+        n = len(oh)
+        freq_prefix = np.zeros((n + 1, num_range + 1), dtype=np.int32)
+        np.cumsum(oh, axis=0, dtype=np.int32, out=freq_prefix[1:])
+        pos = np.where(oh.astype(bool), np.arange(n, dtype=np.int32)[:, None], np.int32(-1))
+        last_pos = np.maximum.accumulate(pos, axis=0) if n else pos
+        n_blocks = n // BLOCK
+        pair_blocks = np.zeros((n_blocks + 1, num_range + 1, num_range + 1), dtype=np.int32)
+        for b in range(n_blocks):
+            x = oh[b * BLOCK:(b + 1) * BLOCK].astype(np.float32)
+            pair_blocks[b + 1] = pair_blocks[b] + (x.T @ x).astype(np.int32)
+        return cls(ds.concurso, ds.numbers, num_range, freq_prefix, last_pos, pair_blocks, fingerprint(ds))
+
+    # --- Persistência ---
+    def save(self, path):
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, concurso=self.concurso, numbers=self.numbers, freq_prefix=self.freq_prefix,
+                 last_pos=self.last_pos, pair_blocks=self.pair_blocks, fingerprint=self.fingerprint,
+                 num_range=np.array(self.num_range))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z['concurso'], z['numbers'], int(z['num_range']), z['freq_prefix'], z['last_pos'],
+                       z['pair_blocks'], z['fingerprint'])
+
+    # --- Consultas ---
+    def window(self, start, end):
+        """Concursos [start, end] -> posições [lo, hi) nos arrays. Início depois do fim dá janela vazia."""
+        lo, hi = int(np.searchsorted(self.concurso, start, 'left')), int(np.searchsorted(self.concurso, end, 'right'))
+        return lo, max(hi, lo)
+
+    def frequency(self, lo, hi):
+        return self.freq_prefix[hi] - self.freq_prefix[lo]
+
+    def delay(self, hi):
+        """Atraso (em sorteios) de cada dezena ao fim da janela; quem nunca saiu tem atraso = hi."""
+        if hi <= 0: return np.zeros(self.num_range + 1, dtype=np.int32)
+        return (hi - 1) - self.last_pos[hi - 1]
+
+    def last_seen(self, hi):
+        """Concurso da última aparição de cada dezena até a posição hi (0 = nunca)."""
+        if hi <= 0: return np.zeros(self.num_range + 1, dtype=np.int64)
+        lp = self.last_pos[hi - 1]
+        return np.where(lp >= 0, self.concurso[np.maximum(lp, 0)], 0)
+
+    def _partial_pairs(self, lo, hi):
+        x = one_hot(self.numbers[lo:hi], self.num_range).astype(np.float32)
+        return (x.T @ x).astype(np.int32)
+
+    def pair_counts(self, lo, hi):
+        """Matriz (range+1, range+1) de coocorrência na janela; a diagonal é zerada."""
+        b_lo, b_hi = -(-lo // BLOCK), hi // BLOCK
+        if b_lo < b_hi:
+            out = self.pair_blocks[b_hi] - self.pair_blocks[b_lo]
+            out = out + self._partial_pairs(lo, b_lo * BLOCK) + self._partial_pairs(b_hi * BLOCK, hi)
+        else: out = self._partial_pairs(lo, hi)
+        np.fill_diagonal(out, 0)
+        return out
+
+# --- Acesso ---
+
+_indexes = {}
+_lock = threading.Lock()
+
+def index_path(game_name):
+    return f"{os.path.splitext(db_path())[0]}.{BASE_CONFIG[game_name]['slug']}.stats.npz"
+
+@timed()
+def get_index(game_name):
+    """Índice da modalidade para os sorteios atuais do cache: memória -> disco -> reconstrução."""
+    ds = draw_cache.get(game_name)
+    fp = fingerprint(ds)
+    with _lock:
+        idx = _indexes.get(game_name)
+        if idx is not None and np.array_equal(idx.fingerprint, fp): return idx
+        path = index_path(game_name)
+        idx = None
+        if os.path.exists(path):
+            try:
+                idx = StatsIndex.load(path)
+                if not np.array_equal(idx.fingerprint, fp): idx = None
+            except (OSError, ValueError, KeyError): idx = None
+        if idx is None:
+            idx = StatsIndex.build(ds, BASE_CONFIG[game_name]['range'])
+            try: idx.save(path)
+            except OSError: pass  # diretório somente leitura: segue só em memória
+        _indexes[game_name] = idx
+        return idx
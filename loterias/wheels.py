@@ -0,0 +1,140 @@
+import itertools
+import time
+from math import comb
+from typing import NamedTuple
+
+import numpy as np
+
+from loterias.bitmask import CHUNK_CELLS, popcount
+
+# --- Fechamentos ---
+# Completo: todas as C(v, k) combinações dos números escolhidos, contadas analiticamente e
+# geradas sob demanda (página a página, por ranking lexicográfico).
+# Reduzido: cobertura (v, k, t, m) por busca gulosa em bitmasks: se m dos v números saírem,
+# ao menos um jogo faz t pontos. Bits representam posições (0..v-1) na lista escolhida.
+
+MAX_REDUCED_NUMBERS = 64
+MAX_TARGETS = 750_000  # alvos uint64 + índices: dezenas de MB no pior caso
+CANDIDATES_PER_STEP = 128
+MAX_EXPORT_ROWS = 1_000_000  # CSV do fechamento completo (~20 MB para 6 dezenas)
+SAMPLE_TARGETS = 4096  # alvos descobertos usados para pontuar os candidatos
+
+def full_wheel_count(n_numbers, k):
+    return comb(n_numbers, k)
+
+def unrank_combination(rank, n, k):
+    """Índices da combinação de posição `rank` (ordem lexicográfica) entre as C(n, k)."""
+    out, x = [], 0
+    for i in range(k):
+        while True:
+            c = comb(n - x - 1, k - i - 1)
+            if rank < c: break
+            rank -= c; x += 1
+        out.append(x); x += 1
+    return out
+
+def _next_combination(idx, n):
+    k = len(idx)
+    for i in range(k - 1, -1, -1):
+        if idx[i] != i + n - k:
+            idx[i] += 1
+            for j in range(i + 1, k): idx[j] = idx[j - 1] + 1
+            return True
+    return False
+
+def iter_full_wheel(numbers, k, start=0):
+    nums = sorted(numbers)
+    if start >= comb(len(nums), k): return
+    idx = unrank_combination(start, len(nums), k)
+    while True:
+        yield [nums[i] for i in idx]
+        if not _next_combination(idx, len(nums)): return
+
+def full_wheel_page(numbers, k, page, page_size=100):
+    return list(itertools.islice(iter_full_wheel(numbers, k, page * page_size), page_size))
+
+def full_wheel_csv(numbers, k):
+    header = ",".join(f"B{i + 1}" for i in range(k))
+    yield header + "\n"
+    for row in iter_full_wheel(numbers, k): yield ",".join(map(str, row)) + "\n"
+
+class WheelResult(NamedTuple):
+    tickets: list
+    n_numbers: int
+    k: int
+    t: int
+    m: int
+    coverage: float  # fração dos m-subconjuntos garantidos
+    seconds: float
+
+    @property
+    def complete(self):
+        return self.coverage >= 1.0
+
+def _subset_masks(v, m):
+    """Bitmasks de todos os m-subconjuntos de range(v), montados nível a nível (sem tuplas Python)."""
+    if 2 * m > v: return np.uint64((1 << v) - 1) ^ _subset_masks(v, v - m)  # complemento: níveis intermediários menores
+    masks, top = np.zeros(1, dtype=np.uint64), np.full(1, -1, dtype=np.int8)
+    for _ in range(m):
+        parts = [(masks[top < p] | np.uint64(1 << p), p) for p in range(v)]
+        masks = np.concatenate([a for a, _ in parts])
+        top = np.concatenate([np.full(len(a), p, dtype=np.int8) for a, p in parts])
+    return masks
+
+def _covers(tickets, targets, t):
+    return popcount(tickets[:, None] & targets[None, :]) >= t
+
+def _cover_counts(chosen, targets, t):
+    """Quantos jogos cobrem cada alvo, em blocos de alvos para limitar a memória."""
+    count = np.zeros(len(targets), dtype=np.uint16)
+    if len(chosen) == 0: return count
+    step = max(1, CHUNK_CELLS // len(chosen))
+    for s in range(0, len(targets), step):
+        count[s:s + step] = _covers(chosen, targets[s:s + step], t).sum(axis=0)
+    return count
+
+def reduced_wheel(numbers, k, t, m, time_budget=5.0, seed=None, candidates=CANDIDATES_PER_STEP, sample=SAMPLE_TARGETS):
+    """Fechamento reduzido guloso. Para ao cobrir tudo ou ao estourar `time_budget` segundos.
+
+    O ganho de cada candidato é estimado numa amostra de até `sample` alvos descobertos; só o escolhido
+    é testado contra todos, e os alvos cobertos saem da lista (memória O(alvos), não candidatos x alvos)."""
+    t0 = time.perf_counter()
+    nums = sorted(numbers); v = len(nums)
+    if v > MAX_REDUCED_NUMBERS: raise ValueError(f"Máximo de {MAX_REDUCED_NUMBERS} números no fechamento reduzido.")
+    if not (1 <= t <= min(k, m) and m <= v and k <= v): raise ValueError("Parâmetros inválidos: exige t ≤ k, t ≤ m ≤ números escolhidos.")
+    if comb(v, m) > MAX_TARGETS: raise ValueError(f"C({v},{m}) = {comb(v, m):,} combinações a cobrir: o limite é {MAX_TARGETS:,}.")
+    rng = np.random.default_rng(seed)
+    targets = _subset_masks(v, m)
+    left = targets
+    chosen = []
+    while len(left) and time.perf_counter() - t0 < time_budget:
+        tgt = left[rng.integers(len(left))]
+        tpos = np.array([i for i in range(v) if (int(tgt) >> i) & 1])
+        # Candidatos: t posições do alvo (garante que ele seja coberto) + k - t quaisquer das restantes.
+        pick = tpos[np.argpartition(rng.random((candidates, m)), t - 1, axis=1)[:, :t]]
+        keys = rng.random((candidates, v))
+        np.put_along_axis(keys, pick, np.inf, axis=1)
+        rest = np.argpartition(keys, k - t - 1, axis=1)[:, :k - t] if k > t else np.empty((candidates, 0), dtype=np.int64)
+        pos = np.concatenate([pick, rest], axis=1).astype(np.uint64)
+        cand = np.left_shift(np.uint64(1), pos).sum(axis=1, dtype=np.uint64)
+        probe = left if len(left) <= sample else left[rng.integers(len(left), size=sample)]
+        best = cand[int(np.argmax(_covers(cand, probe, t).sum(axis=1)))]
+        chosen.append(best)
+        left = left[popcount(left & best) < t]
+    chosen = np.array(chosen, dtype=np.uint64)
+    count = _cover_counts(chosen, targets, t)
+    chosen, count = _prune(chosen, targets, t, count)
+    coverage = float((count > 0).mean()) if len(chosen) else 0.0
+    tickets = [[nums[i] for i in range(v) if (int(c) >> i) & 1] for c in chosen]
+    return WheelResult(tickets, v, k, t, m, coverage, time.perf_counter() - t0)
+
+def _prune(chosen, targets, t, count):
+    """Remove jogos redundantes (todos os alvos deles também cobertos por outro jogo), do último ao primeiro.
+    `count` (coberturas por alvo) é atualizado no lugar; cada jogo é testado sozinho contra os alvos."""
+    if len(chosen) < 2: return chosen, count
+    keep = np.ones(len(chosen), dtype=bool)
+    for i in range(len(chosen) - 1, -1, -1):
+        cov = popcount(targets & chosen[i]) >= t
+        if (count[cov] >= 2).all():
+            keep[i] = False; count[cov] -= 1
+    return chosen[keep], count